@@ -2,6 +2,8 @@
 """Export TEF file to ABC notation."""
 
 import sys
+from itertools import groupby
+from operator import attrgetter, itemgetter
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
@@ -10,7 +12,7 @@ from tef_parser import TEFReader
 
 
 # MIDI pitch to ABC note mapping
-def midi_to_abc(pitch: int) -> str:
+def _compute_abc(pitch: int) -> str:
     """Convert MIDI pitch to ABC notation.
 
     ABC convention:
@@ -49,13 +51,24 @@ def midi_to_abc(pitch: int) -> str:
             return note + "," * ((59 - pitch) // 12 + 1)
 
 
+# Precomputed ABC spelling for every MIDI pitch
+_ABC_TABLE: list[str] = [_compute_abc(p) for p in range(128)]
+
+
+def midi_to_abc(pitch: int) -> str:
+    """Convert MIDI pitch to ABC notation (table lookup for 0-127)."""
+    if 0 <= pitch < 128:
+        return _ABC_TABLE[pitch]
+    return _compute_abc(pitch)
+
+
 def tef_to_abc(tef, output_path: Path):
     """Convert parsed TEF to ABC notation file."""
 
-    # Get melody notes
+    # Get melody notes (is_melody implies a decodable string/fret)
     melody_notes = sorted(
-        [e for e in tef.note_events if e.is_melody and e.decode_string_fret()],
-        key=lambda e: e.position
+        [e for e in tef.note_events if e.is_melody],
+        key=attrgetter('position')
     )
 
     if not melody_notes:
@@ -75,45 +88,37 @@ def tef_to_abc(tef, output_path: Path):
     ]
 
     # Convert notes to ABC
-    # Group by position to handle chords
-    notes_by_pos = {}
-    for evt in melody_notes:
-        pitch = evt.get_pitch()
-        if pitch:
-            notes_by_pos.setdefault(evt.position, []).append(pitch)
+    # Group by position to handle chords; melody_notes is already sorted by
+    # position, so each chord is a consecutive run
+    pitched = [(evt.position, evt.get_pitch()) for evt in melody_notes]
+    chords = groupby([note for note in pitched if note[1]], key=itemgetter(0))
 
     # Build ABC note string
-    abc_notes = []
-    positions = sorted(notes_by_pos.keys())
-
-    # Calculate note durations based on gaps between positions
-    for i, pos in enumerate(positions):
-        pitches = notes_by_pos[pos]
+    note_strs = []
+    for _, chord in chords:
+        pitches = [pitch for _, pitch in chord]
 
         # Convert pitches to ABC
         if len(pitches) == 1:
-            note_str = midi_to_abc(pitches[0])
+            note_strs.append(midi_to_abc(pitches[0]))
         else:
             # Chord: [CEG]
-            note_str = "[" + "".join(midi_to_abc(p) for p in sorted(pitches)) + "]"
-
-        abc_notes.append(note_str)
-
-        # Add bar lines roughly every 8 notes (assuming 8th notes in 4/4)
-        if (i + 1) % 8 == 0:
-            abc_notes.append("|")
+            note_strs.append("[" + "".join(midi_to_abc(p) for p in sorted(pitches)) + "]")
 
-        # Line break every 4 bars
-        if (i + 1) % 32 == 0:
-            abc_notes.append("\n")
+    # Add bar lines roughly every 8 notes (assuming 8th notes in 4/4)
+    # and a line break every 4 bars, joining each level once
+    bars = [" ".join(note_strs[i:i + 8]) for i in range(0, len(note_strs), 8)]
+    abc_body = " | \n ".join(" | ".join(bars[i:i + 4]) for i in range(0, len(bars), 4))
+    if note_strs and len(note_strs) % 8 == 0:
+        abc_body += " |"
+        if len(note_strs) % 32 == 0:
+            abc_body += " \n"
 
-    # Join notes with spaces
-    abc_body = " ".join(abc_notes)
     lines.append(abc_body)
     lines.append("|]")  # End bar
 
     # Write file
-    output_path.write_text("\n".join(lines))
+    output_path.write_bytes("\n".join(lines).encode("utf-8"))
     print(f"Wrote {len(melody_notes)} notes to {output_path}")
 
 
@@ -136,7 +141,7 @@ def main():
     reader = TEFReader(input_path)
     tef = reader.parse()
 
-    melody_notes = [e for e in tef.note_events if e.is_melody and e.decode_string_fret()]
+    melody_notes = [e for e in tef.note_events if e.is_melody]
     print(f"Parsing: {input_path.name}")
     print(f"Title: {tef.title}")
     print(f"Melody notes: {len(melody_notes)}")
@@ -10,8 +10,25 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
 from tef_parser import TEFReader
 
 
-def tef_to_dict(tef) -> dict:
-    """Convert TEFFile to a dictionary for JSON export."""
+def event_to_dict(e) -> dict:
+    """Convert a single TEFNoteEvent to a dictionary for JSON export."""
+    return {
+        "position": e.position,
+        "track": e.track,
+        "marker": e.marker,
+        "articulation": e.articulation,
+        "pitch_byte": e.pitch_byte,
+        "b11": e.b11,
+        "estimated_pitch": e.get_pitch(),
+    }
+
+
+def tef_to_dict(tef, include_events: bool = True) -> dict:
+    """Convert TEFFile to a dictionary for JSON export.
+
+    With include_events=False the "events" list is left empty, which lets
+    write_json() stream the events instead of materializing them.
+    """
     return {
         "file": tef.path.name,
         "version": tef.header.version,
@@ -29,22 +46,44 @@ def tef_to_dict(tef) -> dict:
         "note_events": {
             "count": len(tef.note_events),
             "positions": len(set(e.position for e in tef.note_events)),
-            "events": [
-                {
-                    "position": e.position,
-                    "track": e.track,
-                    "marker": e.marker,
-                    "articulation": e.articulation,
-                    "pitch_byte": e.pitch_byte,
-                    "b11": e.b11,
-                    "estimated_pitch": e.get_pitch(),
-                }
-                for e in tef.note_events
-            ],
+            "events": [event_to_dict(e) for e in tef.note_events] if include_events else [],
         },
     }
 
 
+def write_json(tef, fp, indent: int | None = None):
+    """Write TEFFile as JSON to fp, encoding one event at a time.
+
+    Output is identical to json.dumps(tef_to_dict(tef), indent=indent).
+    """
+    # "events" is the last key, so the final "[]" in the encoded header
+    # is its placeholder
+    head, _, tail = json.dumps(tef_to_dict(tef, include_events=False), indent=indent).rpartition("[]")
+    fp.write(head)
+    fp.write("[")
+
+    encode = json.JSONEncoder(indent=indent).encode
+    events = tef.note_events
+    if events:
+        if indent is None:
+            fp.write(encode(event_to_dict(events[0])))
+            for e in events[1:]:
+                fp.write(", ")
+                fp.write(encode(event_to_dict(e)))
+        else:
+            # Events sit three levels deep: root -> note_events -> events
+            pad = "\n" + " " * (3 * indent)
+            for i, e in enumerate(events):
+                if i:
+                    fp.write(",")
+                fp.write(pad)
+                fp.write(encode(event_to_dict(e)).replace("\n", pad))
+            fp.write("\n" + " " * (2 * indent))
+
+    fp.write("]")
+    fp.write(tail)
+
+
 def main():
     if len(sys.argv) < 2:
         print("Usage: export_json.py <file.tef> [--pretty]")
@@ -59,12 +98,9 @@ def main():
 
     reader = TEFReader(path)
     tef = reader.parse()
-    data = tef_to_dict(tef)
 
-    if pretty:
-        print(json.dumps(data, indent=2))
-    else:
-        print(json.dumps(data))
+    write_json(tef, sys.stdout, indent=2 if pretty else None)
+    sys.stdout.write("\n")
 
 
 if __name__ == "__main__":
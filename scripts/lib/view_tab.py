@@ -10,42 +10,54 @@ Displays parsed note events as ASCII tablature, showing:
 
 import sys
 from pathlib import Path
-from collections import defaultdict
+from collections import Counter
+from itertools import groupby, islice
+from operator import attrgetter
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
 
 from tef_parser import TEFReader
 
+# Marker types that carry playable notes
+NOTE_MARKERS = frozenset({'I', 'F', 'L'})
+
 
 def view_tablature(tef, measures_per_line=4, beats_per_measure=4):
     """Display parsed TEF as ASCII tablature."""
 
-    print(f"Title: {tef.title}")
-    print(f"Version: {tef.header.version}")
-    print()
+    # Collect output lines and write them in one call
+    out = []
+
+    out.append(f"Title: {tef.title}")
+    out.append(f"Version: {tef.header.version}")
+    out.append("")
 
     if tef.instruments:
-        print("Instruments:")
+        out.append("Instruments:")
         for inst in tef.instruments:
-            print(f"  {inst.name} ({inst.num_strings} strings)")
-        print()
-
-    # Get note events grouped by position
-    events_by_pos = defaultdict(list)
-    for e in tef.note_events:
-        if e.marker in ('I', 'F', 'L'):
-            events_by_pos[e.position].append(e)
-
-    if not events_by_pos:
-        print("No note events found.")
+            out.append(f"  {inst.name} ({inst.num_strings} strings)")
+        out.append("")
+
+    # Get note events sorted by position (stable, so file order is kept
+    # within a position), then group consecutive runs
+    by_position = attrgetter('position')
+    shown_events = sorted(
+        [e for e in tef.note_events if e.marker in NOTE_MARKERS],
+        key=by_position
+    )
+
+    if not shown_events:
+        out.append("No note events found.")
+        sys.stdout.write("\n".join(out) + "\n")
         return
 
-    positions = sorted(events_by_pos.keys())
-    max_pos = max(positions)
+    events_by_pos = [(pos, list(events)) for pos, events in groupby(shown_events, key=by_position)]
+    min_pos = events_by_pos[0][0]
+    max_pos = events_by_pos[-1][0]
 
-    print(f"Note Events: {sum(len(v) for v in events_by_pos.values())} events")
-    print(f"Positions: {len(positions)} unique ({min(positions)} to {max_pos})")
-    print()
+    out.append(f"Note Events: {len(shown_events)} events")
+    out.append(f"Positions: {len(events_by_pos)} unique ({min_pos} to {max_pos})")
+    out.append("")
 
     # Articulation symbols
     ART_SYMBOLS = {
@@ -62,93 +74,78 @@ def view_tablature(tef, measures_per_line=4, beats_per_measure=4):
         'L': '~',  # Legato
         'S': '□',  # Special
     }
+    art_of = ART_SYMBOLS.get
+    marker_of = MARKER_SYMBOLS.get
 
     # Display as timeline
-    print("=" * 80)
-    print("TIMELINE VIEW (tick positions)")
-    print("=" * 80)
-    print()
+    out.append("=" * 80)
+    out.append("TIMELINE VIEW (tick positions)")
+    out.append("=" * 80)
+    out.append("")
 
     # Group by sections of 100 ticks
     SECTION_SIZE = 50
-    sections = defaultdict(list)
-    for pos in positions:
-        section = pos // SECTION_SIZE
-        sections[section].append(pos)
+    sections = groupby(events_by_pos, key=lambda item: item[0] // SECTION_SIZE)
 
-    for section in sorted(sections.keys())[:20]:  # First 20 sections
+    for section, rows in islice(sections, 20):  # First 20 sections
         start = section * SECTION_SIZE
         end = start + SECTION_SIZE
-        print(f"--- Ticks {start:3d} to {end:3d} ---")
-
-        for pos in sorted(sections[section]):
-            events = events_by_pos[pos]
-
-            # Build event summary
-            event_strs = []
-            for e in events:
-                art = ART_SYMBOLS.get(e.extra, '?')
-                marker = MARKER_SYMBOLS.get(e.marker, '?')
-                # Show track, marker, articulation, and raw values
-                event_strs.append(f"T{e.track}{marker}{art}(b9={e.pitch_byte:2d},b11={e.b11:3d})")
-
-            events_str = ' '.join(event_strs)
-            print(f"  {pos:4d}: {events_str}")
-        print()
+        out.append(f"--- Ticks {start:3d} to {end:3d} ---")
+
+        for pos, events in rows:
+            # Build event summary: track, marker, articulation, and raw values
+            events_str = ' '.join([
+                f"T{e.track}{marker_of(e.marker, '?')}{art_of(e.extra, '?')}(b9={e.pitch_byte:2d},b11={e.b11:3d})"
+                for e in events
+            ])
+            out.append(f"  {pos:4d}: {events_str}")
+        out.append("")
+
+    # Tally all summaries from the displayed events
+    art_counts = Counter(map(attrgetter('articulation'), shown_events))
+    track_counts = Counter(map(attrgetter('track'), shown_events))
+    b9_counts = Counter(map(attrgetter('pitch_byte'), shown_events))
+    b11_counts = Counter(map(attrgetter('b11'), shown_events))
 
     # Show articulation summary
-    print("=" * 80)
-    print("ARTICULATION SUMMARY")
-    print("=" * 80)
-    art_counts = defaultdict(int)
-    for pos, events in events_by_pos.items():
-        for e in events:
-            art_counts[e.articulation] += 1
+    out.append("=" * 80)
+    out.append("ARTICULATION SUMMARY")
+    out.append("=" * 80)
 
     for art, count in sorted(art_counts.items()):
-        print(f"  {art:12s}: {count:4d}")
-    print()
+        out.append(f"  {art:12s}: {count:4d}")
+    out.append("")
 
     # Show track distribution
-    print("=" * 80)
-    print("TRACK/VOICE DISTRIBUTION")
-    print("=" * 80)
-    track_counts = defaultdict(int)
-    for pos, events in events_by_pos.items():
-        for e in events:
-            track_counts[e.track] += 1
+    out.append("=" * 80)
+    out.append("TRACK/VOICE DISTRIBUTION")
+    out.append("=" * 80)
 
     for track, count in sorted(track_counts.items()):
-        print(f"  Track {track}: {count:4d} events")
-    print()
+        out.append(f"  Track {track}: {count:4d} events")
+    out.append("")
 
     # Show b9 value distribution
-    print("=" * 80)
-    print("B9 (PITCH_BYTE) DISTRIBUTION")
-    print("=" * 80)
-    b9_counts = defaultdict(int)
-    for pos, events in events_by_pos.items():
-        for e in events:
-            b9_counts[e.pitch_byte] += 1
+    out.append("=" * 80)
+    out.append("B9 (PITCH_BYTE) DISTRIBUTION")
+    out.append("=" * 80)
 
     for b9, count in sorted(b9_counts.items()):
-        print(f"  b9={b9:2d}: {count:4d} events")
-    print()
+        out.append(f"  b9={b9:2d}: {count:4d} events")
+    out.append("")
 
     # Show b11 value distribution
-    print("=" * 80)
-    print("B11 DISTRIBUTION (possible string/fret encoding)")
-    print("=" * 80)
-    b11_counts = defaultdict(int)
-    for pos, events in events_by_pos.items():
-        for e in events:
-            b11_counts[e.b11] += 1
+    out.append("=" * 80)
+    out.append("B11 DISTRIBUTION (possible string/fret encoding)")
+    out.append("=" * 80)
 
     for b11, count in sorted(b11_counts.items()):
         # Decode as potential string/fret
         hi3 = b11 >> 5
         lo = (b11 & 0x1f) >> 3
-        print(f"  b11={b11:3d} (s{hi3+1} f{lo}): {count:4d} events")
+        out.append(f"  b11={b11:3d} (s{hi3+1} f{lo}): {count:4d} events")
+
+    sys.stdout.write("\n".join(out) + "\n")
 
 
 def main():
@@ -1,5 +1,6 @@
 """TEF file parser for TablEdit tablature files."""
 
 from .reader import TEFReader, TEFFile, TEFVersionError
+from .cache import parse_cached
 
-__all__ = ["TEFReader", "TEFFile", "TEFVersionError"]
+__all__ = ["TEFReader", "TEFFile", "TEFVersionError", "parse_cached"]
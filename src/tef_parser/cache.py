@@ -0,0 +1,120 @@
+"""On-disk cache of parsed TEF files.
+
+Parsed TEFFile objects are pickled under $XDG_CACHE_HOME/tef_parser
+(default ~/.cache/tef_parser). Entries are keyed by the file's resolved
+path, mtime and size, plus the mtime and size of reader.py so that parser
+changes invalidate old entries. Any cache I/O problem falls back to a
+normal parse.
+
+The directory is created private (0700) and is only read when it is
+owned by the current user and not writable by anyone else, since loading
+an entry unpickles it. Entries from other parser versions are pruned and
+at most MAX_ENTRIES are kept. Set TEF_PARSER_NO_CACHE=1 (or pass
+--no-cache to the CLI) to bypass the cache entirely.
+"""
+
+import hashlib
+import os
+import pickle
+import stat
+from pathlib import Path
+
+from . import reader
+from .reader import TEFFile, TEFReader
+
+# Most entries kept; the least recently written beyond this are removed
+MAX_ENTRIES = 256
+
+
+def cache_dir() -> Path:
+    """Directory holding cached parse results."""
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "tef_parser"
+
+
+def cache_enabled() -> bool:
+    """False when TEF_PARSER_NO_CACHE is set to a non-empty value."""
+    return not os.environ.get("TEF_PARSER_NO_CACHE")
+
+
+def _parser_stamp() -> str:
+    """Short hash of reader.py's mtime and size, shared by its entries."""
+    parser_st = os.stat(reader.__file__)
+    return hashlib.sha1(f"{parser_st.st_mtime_ns}|{parser_st.st_size}".encode()).hexdigest()[:12]
+
+
+def _cache_path(path: Path, stamp: str) -> Path:
+    """Cache file for the current contents of path and parser source."""
+    st = path.stat()
+    key = f"{path.resolve()}|{st.st_mtime_ns}|{st.st_size}"
+    return cache_dir() / f"{stamp}-{hashlib.sha1(key.encode()).hexdigest()}.pickle"
+
+
+def _is_private(directory: Path) -> bool:
+    """True if directory is ours and no one else can write to it."""
+    st = directory.stat()
+    return st.st_uid == os.getuid() and not st.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+
+def _prune(directory: Path, stamp: str):
+    """Drop entries from other parser versions and cap the entry count."""
+    current = []
+    for entry in directory.glob("*.pickle"):
+        try:
+            if entry.name.startswith(stamp + "-"):
+                current.append((entry.stat().st_mtime_ns, entry))
+            else:
+                entry.unlink()
+        except OSError:
+            pass
+
+    current.sort(reverse=True)
+    for _, entry in current[MAX_ENTRIES:]:
+        entry.unlink(missing_ok=True)
+
+
+def parse_cached(path: str | Path, use_cache: bool = True) -> TEFFile:
+    """Parse a TEF file, reusing a cached result when the file is unchanged.
+
+    Args:
+        path: Path to the .tef file
+        use_cache: If False (or TEF_PARSER_NO_CACHE is set), parse without
+            reading or writing the cache
+
+    Returns:
+        Parsed TEFFile (same as TEFReader(path).parse())
+    """
+    path = Path(path)
+    if not use_cache or not cache_enabled():
+        with TEFReader(path) as tef_reader:
+            return tef_reader.parse()
+
+    stamp = _parser_stamp()
+    entry = _cache_path(path, stamp)
+
+    try:
+        if _is_private(entry.parent):
+            with open(entry, "rb") as f:
+                tef = pickle.load(f)
+            if isinstance(tef, TEFFile):
+                tef.path = path
+                return tef
+    except Exception:
+        # Missing, truncated or stale entry - parse normally
+        pass
+
+    with TEFReader(path) as tef_reader:
+        tef = tef_reader.parse()
+
+    try:
+        entry.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        os.chmod(entry.parent, 0o700)
+        tmp = entry.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump(tef, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, entry)
+        _prune(entry.parent, stamp)
+    except (OSError, pickle.PicklingError):
+        pass
+
+    return tef
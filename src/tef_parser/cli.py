@@ -2,11 +2,19 @@
 """CLI for TEF file parser."""
 
 import argparse
+import os
 import sys
-from collections import Counter, defaultdict
+from collections import Counter
+from itertools import groupby, islice
+from operator import attrgetter
 from pathlib import Path
 
-from .reader import TEFReader
+from .cache import parse_cached
+
+# Marker types that carry playable notes
+NOTE_MARKERS = frozenset({'I', 'F', 'L'})
+
+_by_position = attrgetter('position')
 
 
 def cmd_parse(args):
@@ -16,8 +24,7 @@ def cmd_parse(args):
         print(f"Error: File not found: {path}", file=sys.stderr)
         return 1
 
-    reader = TEFReader(path)
-    tef = reader.parse()
+    tef = parse_cached(path, use_cache=not args.no_cache)
     print(tef.dump())
 
     if args.verbose:
@@ -35,8 +42,12 @@ def cmd_version(args):
         print(f"Error: File not found: {path}", file=sys.stderr)
         return 1
 
-    with open(path, 'rb') as f:
-        h = f.read(4)
+    # Only the 4-byte header is needed; skip buffered file object setup
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        h = os.read(fd, 4)
+    finally:
+        os.close(fd)
     print(f"TEF version: {h[3]}.{h[2]:02d}")
     return 0
 
@@ -48,122 +59,87 @@ def cmd_view(args):
         print(f"Error: File not found: {path}", file=sys.stderr)
         return 1
 
-    reader = TEFReader(path)
-    tef = reader.parse()
+    tef = parse_cached(path, use_cache=not args.no_cache)
 
-    print(f"Title: {tef.title}")
-    print(f"Version: {tef.header.version}")
-    print()
+    # Collect output lines and write them in one call
+    out = []
+    out.append(f"Title: {tef.title}")
+    out.append(f"Version: {tef.header.version}")
+    out.append("")
 
     if tef.instruments:
-        print("Instruments:")
+        out.append("Instruments:")
         for inst in tef.instruments:
-            print(f"  {inst.name} ({inst.num_strings} strings)")
-        print()
+            out.append(f"  {inst.name} ({inst.num_strings} strings)")
+        out.append("")
 
-    # Get note events grouped by position
-    events_by_pos = defaultdict(list)
-    for e in tef.note_events:
-        if e.marker in ('I', 'F', 'L'):
-            events_by_pos[e.position].append(e)
+    # Get note events grouped by position (stable sort keeps file order within a position)
+    shown_events = sorted(
+        [e for e in tef.note_events if e.marker in NOTE_MARKERS],
+        key=_by_position
+    )
 
-    if not events_by_pos:
-        print("No note events found.")
+    if not shown_events:
+        out.append("No note events found.")
+        sys.stdout.write("\n".join(out) + "\n")
         return 0
 
-    positions = sorted(events_by_pos.keys())
-    max_pos = max(positions)
+    events_by_pos = [(pos, list(events)) for pos, events in groupby(shown_events, key=_by_position)]
 
-    print(f"Note Events: {sum(len(v) for v in events_by_pos.values())} events")
-    print(f"Positions: {len(positions)} unique ({min(positions)} to {max_pos})")
-    print()
+    out.append(f"Note Events: {len(shown_events)} events")
+    out.append(f"Positions: {len(events_by_pos)} unique ({events_by_pos[0][0]} to {events_by_pos[-1][0]})")
+    out.append("")
 
     # Articulation and marker symbols
     ART_SYMBOLS = {0: ' ', 1: 'H', 2: 'P', 3: 'S'}
     MARKER_SYMBOLS = {'I': '*', 'F': 'o', 'L': '~', 'S': '#'}
+    art_of = ART_SYMBOLS.get
+    marker_of = MARKER_SYMBOLS.get
 
-    print("=" * 80)
-    print("TIMELINE VIEW (tick positions)")
-    print("=" * 80)
-    print()
+    out.append("=" * 80)
+    out.append("TIMELINE VIEW (tick positions)")
+    out.append("=" * 80)
+    out.append("")
 
     # Group by sections
     SECTION_SIZE = 50
-    sections = defaultdict(list)
-    for pos in positions:
-        section = pos // SECTION_SIZE
-        sections[section].append(pos)
+    sections = groupby(events_by_pos, key=lambda item: item[0] // SECTION_SIZE)
 
-    for section in sorted(sections.keys())[:20]:
+    for section, rows in islice(sections, 20):
         start = section * SECTION_SIZE
         end = start + SECTION_SIZE
-        print(f"--- Ticks {start:3d} to {end:3d} ---")
-
-        for pos in sorted(sections[section]):
-            events = events_by_pos[pos]
-            event_strs = []
-            for e in events:
-                art = ART_SYMBOLS.get(e.extra, '?')
-                marker = MARKER_SYMBOLS.get(e.marker, '?')
-                event_strs.append(f"T{e.track}{marker}{art}(b9={e.pitch_byte:2d},b11={e.b11:3d})")
-            events_str = ' '.join(event_strs)
-            print(f"  {pos:4d}: {events_str}")
-        print()
+        out.append(f"--- Ticks {start:3d} to {end:3d} ---")
+
+        for pos, events in rows:
+            events_str = ' '.join([
+                f"T{e.track}{marker_of(e.marker, '?')}{art_of(e.extra, '?')}(b9={e.pitch_byte:2d},b11={e.b11:3d})"
+                for e in events
+            ])
+            out.append(f"  {pos:4d}: {events_str}")
+        out.append("")
 
     # Summary sections
-    print("=" * 80)
-    print("TRACK DISTRIBUTION")
-    print("=" * 80)
-    track_counts = defaultdict(int)
-    for events in events_by_pos.values():
-        for e in events:
-            track_counts[e.track] += 1
+    out.append("=" * 80)
+    out.append("TRACK DISTRIBUTION")
+    out.append("=" * 80)
+    track_counts = Counter(map(attrgetter('track'), shown_events))
     for track, count in sorted(track_counts.items()):
-        print(f"  Track {track}: {count:4d} events")
+        out.append(f"  Track {track}: {count:4d} events")
 
+    sys.stdout.write("\n".join(out) + "\n")
     return 0
 
 
-def expand_notes_with_reading_list(note_events, reading_list, ticks_per_measure: int):
-    """Expand notes according to reading list playback order."""
-    if not reading_list:
-        return [(evt.position, evt) for evt in note_events]
-
-    expanded = []
-    output_measure_offset = 0
-
-    for entry in reading_list:
-        start_tick = (entry.from_measure - 1) * ticks_per_measure
-        end_tick = entry.to_measure * ticks_per_measure
-
-        for evt in note_events:
-            if start_tick <= evt.position < end_tick:
-                relative_pos = evt.position - start_tick
-                output_tick = output_measure_offset * ticks_per_measure + relative_pos
-                expanded.append((output_tick, evt))
-
-        measures_in_entry = entry.to_measure - entry.from_measure + 1
-        output_measure_offset += measures_in_entry
-
-    expanded.sort(key=lambda x: x[0])
-    return expanded
-
-
 def cmd_midi(args):
     """Export TEF file to MIDI."""
-    try:
-        import mido
-    except ImportError:
-        print("Error: mido package required. Install with: uv add mido", file=sys.stderr)
-        return 1
+    from .midi import tef_to_midi
 
     path = Path(args.input)
     if not path.exists():
         print(f"Error: File not found: {path}", file=sys.stderr)
         return 1
 
-    reader = TEFReader(path)
-    tef = reader.parse()
+    tef = parse_cached(path, use_cache=not args.no_cache)
 
     print(f"File: {path.name}")
     print(f"Title: {tef.title}")
@@ -171,7 +147,7 @@ def cmd_midi(args):
 
     # Show tracks
     print(f"\nTracks ({len(tef.instruments)}):")
-    track_counts = Counter(e.track for e in tef.note_events if e.is_melody)
+    track_counts = Counter(map(attrgetter('track'), filter(attrgetter('is_melody'), tef.note_events)))
     for i, inst in enumerate(tef.instruments):
         note_count = track_counts.get(i, 0)
         print(f"  {i}: {inst.name} ({inst.num_strings} strings) - {note_count} notes")
@@ -185,139 +161,10 @@ def cmd_midi(args):
     else:
         output_path = path.with_suffix('.parsed.mid')
 
-    track_filter = args.track
-
-    # Create MIDI file
-    mid = mido.MidiFile(ticks_per_beat=240)
-
-    # Metadata track
-    meta_track = mido.MidiTrack()
-    mid.tracks.append(meta_track)
-    meta_track.append(mido.MetaMessage('track_name', name=tef.title or 'TEF Export'))
-    meta_track.append(mido.MetaMessage('set_tempo', tempo=mido.bpm2tempo(160)))
-
-    # Note track
-    note_track = mido.MidiTrack()
-    mid.tracks.append(note_track)
-
-    # Get instrument info
-    if tef.instruments and 0 <= track_filter < len(tef.instruments):
-        inst = tef.instruments[track_filter]
-        track_name = inst.name
-    else:
-        inst = None
-        track_name = 'All Notes' if track_filter < 0 else 'Melody'
-    note_track.append(mido.MetaMessage('track_name', name=track_name))
-
-    # Set MIDI program
-    midi_program = 25  # acoustic guitar
-    if inst:
-        name_lower = inst.name.lower()
-        if 'banjo' in name_lower:
-            midi_program = 105
-        elif 'bass' in name_lower:
-            midi_program = 32
-        elif 'mandolin' in name_lower:
-            midi_program = 25
-    note_track.append(mido.Message('program_change', program=midi_program, time=0))
-
-    # Get melody notes for selected track
-    note_events = sorted(
-        [e for e in tef.note_events
-         if e.is_melody and e.decode_string_fret()
-         and (track_filter < 0 or e.track == track_filter)],
-        key=lambda e: e.position
-    )
-
-    if not note_events:
-        print("No note events found!")
+    print()
+    if not tef_to_midi(tef, output_path, track_filter=args.track):
         return 1
 
-    # Get tuning
-    tuning = [62, 59, 55, 50, 67]  # Default Open G banjo
-    if tef.instruments and 0 <= track_filter < len(tef.instruments):
-        inst = tef.instruments[track_filter]
-        if inst.tuning_pitches:
-            tuning = inst.tuning_pitches
-
-    # Filter hammer-on decorations
-    filtered_events = []
-    for i, evt in enumerate(note_events):
-        if evt.marker == 'L' and evt.raw_data and evt.raw_data[6] == 0:
-            s, f = evt.decode_string_fret()
-            this_pitch = tuning[s - 1] + f
-            if i + 1 < len(note_events):
-                next_evt = note_events[i + 1]
-                ns, nf = next_evt.decode_string_fret() if next_evt.decode_string_fret() else (0, 0)
-                next_pitch = tuning[ns - 1] + nf if ns > 0 else 0
-                if next_pitch - this_pitch == 1:
-                    continue
-            if i > 0:
-                prev_evt = note_events[i - 1]
-                if prev_evt.marker == 'L':
-                    ps, pf = prev_evt.decode_string_fret() if prev_evt.decode_string_fret() else (0, 0)
-                    prev_pitch = tuning[ps - 1] + pf if ps > 0 else 0
-                    if this_pitch - prev_pitch == 1:
-                        if i + 1 < len(note_events):
-                            next_evt = note_events[i + 1]
-                            ns, nf = next_evt.decode_string_fret() if next_evt.decode_string_fret() else (0, 0)
-                            next_pitch = tuning[ns - 1] + nf if ns > 0 else 0
-                            if next_pitch > this_pitch:
-                                continue
-        filtered_events.append(evt)
-    note_events = filtered_events
-
-    # Timing constants
-    TICKS_PER_POSITION = 60
-    POSITIONS_PER_MEASURE = 16
-
-    # Expand with reading list
-    expanded_notes = expand_notes_with_reading_list(
-        note_events, tef.reading_list, POSITIONS_PER_MEASURE
-    )
-
-    print(f"\nSource notes: {len(note_events)}, Expanded: {len(expanded_notes)}")
-    if tef.reading_list:
-        print(f"Reading list: {len(tef.reading_list)} entries")
-
-    # Build MIDI events
-    midi_events = []
-    for i, (output_pos, evt) in enumerate(expanded_notes):
-        tick = output_pos * TICKS_PER_POSITION
-        pitch = evt.get_pitch(tuning)
-        if pitch is None:
-            continue
-        pitch = max(0, min(127, pitch))
-
-        if i + 1 < len(expanded_notes):
-            next_pos = expanded_notes[i + 1][0]
-            gap_ticks = (next_pos - output_pos) * TICKS_PER_POSITION
-            duration = max(gap_ticks - 10, 60)
-        else:
-            duration = 240
-
-        midi_events.append((tick, 'on', pitch, 80))
-        midi_events.append((tick + duration, 'off', pitch, 0))
-
-    midi_events.sort(key=lambda x: (x[0], x[1] == 'on'))
-
-    # Convert to delta times
-    last_tick = 0
-    for tick, event_type, pitch, velocity in midi_events:
-        delta = tick - last_tick
-        if event_type == 'on':
-            note_track.append(mido.Message('note_on', note=pitch, velocity=velocity, time=delta))
-        else:
-            note_track.append(mido.Message('note_off', note=pitch, velocity=0, time=delta))
-        last_tick = tick
-
-    note_track.append(mido.MetaMessage('end_of_track', time=0))
-    meta_track.append(mido.MetaMessage('end_of_track', time=0))
-
-    mid.save(output_path)
-    print(f"Wrote {len(expanded_notes)} notes to {output_path}")
-    print(f"Duration: ~{midi_events[-1][0] / 240 / 4:.1f} measures at 160 BPM")
-
     return 0
 
 
@@ -330,8 +177,7 @@ def cmd_otf(args):
         print(f"Error: File not found: {path}", file=sys.stderr)
         return 1
 
-    reader = TEFReader(path)
-    tef = reader.parse()
+    tef = parse_cached(path, use_cache=not args.no_cache)
 
     # Convert to OTF
     otf_doc = tef_to_otf(tef)
@@ -343,17 +189,27 @@ def cmd_otf(args):
         suffix = ".otf.json" if args.json else ".otf.yaml"
         output_path = path.with_suffix(suffix)
 
-    # Generate output
+    # Stream output straight to the destination
     if args.json or output_path.suffix == ".json":
-        content = otf_doc.to_json(indent=2)
+        write = otf_doc.write_json
     else:
-        content = otf_doc.to_yaml()
+        write = otf_doc.write_yaml
 
     # Write or print
     if args.stdout:
-        print(content)
+        write(sys.stdout)
+        sys.stdout.write("\n")
     else:
-        output_path.write_text(content)
+        # Write next to the destination and rename, so a failure partway
+        # through never leaves a truncated file behind
+        tmp = output_path.with_name(f"{output_path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp, "w") as f:
+                write(f)
+            os.replace(tmp, output_path)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
         print(f"Wrote {output_path}")
         print(f"  Tracks: {len(otf_doc.tracks)}")
         total_notes = sum(
@@ -374,6 +230,8 @@ def main():
         description='TEF file parser for TablEdit tablature files',
     )
     parser.add_argument('--version', action='version', version='tef-parser 0.1.0')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Parse without reading or writing the parse cache')
 
     subparsers = parser.add_subparsers(dest='command', help='Commands')
 
@@ -0,0 +1,334 @@
+"""MIDI exporter for TEF files."""
+
+from bisect import bisect_left
+from heapq import heappop, heappush
+from operator import attrgetter
+from pathlib import Path
+import struct
+
+from .reader import DEFAULT_TUNING, TEFFile, TEFInstrument
+
+
+# TuxGuitar format: position is in 16th note grid
+# 16 positions per measure in 4/4, 4 positions per beat
+# MIDI: 240 ticks/beat, so 60 MIDI ticks per position
+TICKS_PER_POSITION = 60  # 240 ticks/beat / 4 positions/beat
+POSITIONS_PER_MEASURE = 16  # 4/4 time signature
+TICKS_PER_BEAT = 240
+TEMPO = 375000  # Microseconds per beat (160 BPM)
+
+# Standard MIDI File status bytes (channel 0)
+NOTE_OFF = 0x80
+NOTE_ON = 0x90
+PROGRAM_CHANGE = 0xC0
+# Invariant meta events, encoded once: delta 0, 0xFF, type, length, data
+SET_TEMPO = b'\x00\xff\x51\x03' + TEMPO.to_bytes(3, 'big')
+END_OF_TRACK = b'\x00\xff\x2f\x00'
+
+
+def encode_varlen(value: int) -> bytes:
+    """Encode a delta time as a MIDI variable-length quantity."""
+    if value < 0:
+        raise ValueError(f"MIDI delta time must be non-negative, got {value}")
+    out = [value & 0x7F]
+    value >>= 7
+    while value:
+        out.append(0x80 | (value & 0x7F))
+        value >>= 7
+    return bytes(reversed(out))
+
+
+def track_name_event(name: str) -> bytes:
+    """Delta 0 track_name meta event (latin-1, like mido)."""
+    data = name.encode('latin1')
+    return b'\x00\xff\x03' + encode_varlen(len(data)) + data
+
+
+def write_smf(output_path: Path, tracks: list[bytes]):
+    """Write a type 1 Standard MIDI File from encoded track bodies."""
+    with open(output_path, 'wb') as f:
+        f.write(b'MThd' + struct.pack('>Lhhh', 6, 1, len(tracks), TICKS_PER_BEAT))
+        for data in tracks:
+            f.write(b'MTrk' + struct.pack('>L', len(data)))
+            f.write(data)
+
+
+def expand_notes_with_reading_list(note_events, reading_list, ticks_per_measure: int):
+    """Expand notes according to reading list playback order.
+
+    Args:
+        note_events: List of note events sorted by position
+        reading_list: List of TEFReadingListEntry objects
+        ticks_per_measure: TEF ticks per measure
+
+    Returns:
+        List of (output_tick, note_event) tuples in playback order
+
+    Entries with to_measure < from_measure play nothing and do not move the
+    playback position, so output ticks stay non-negative and in order.
+    """
+    if not reading_list:
+        # No reading list - play notes as-is
+        return [(evt.position, evt) for evt in note_events]
+
+    # A single entry starting at measure 1 that covers every note plays the
+    # score once, unshifted
+    if (len(reading_list) == 1 and reading_list[0].from_measure == 1 and note_events
+            and note_events[0].position >= 0
+            and note_events[-1].position < reading_list[0].to_measure * ticks_per_measure):
+        return [(evt.position, evt) for evt in note_events]
+
+    # note_events is sorted, so each entry's range is a contiguous slice
+    positions = [evt.position for evt in note_events]
+    expanded = []
+    output_measure_offset = 0  # Cumulative measures played
+
+    for entry in reading_list:
+        # Skip reversed (malformed) ranges
+        if entry.to_measure < entry.from_measure:
+            continue
+
+        # Get notes in this measure range (inclusive)
+        start_tick = (entry.from_measure - 1) * ticks_per_measure
+        end_tick = entry.to_measure * ticks_per_measure  # Exclusive
+
+        lo = bisect_left(positions, start_tick)
+        hi = bisect_left(positions, end_tick, lo)
+        # Shift from source position to cumulative playback position
+        shift = output_measure_offset * ticks_per_measure - start_tick
+        expanded.extend(
+            (positions[i] + shift, note_events[i]) for i in range(lo, hi)
+        )
+
+        # Advance the output offset
+        output_measure_offset += entry.to_measure - entry.from_measure + 1
+
+    # Each block starts where the previous one ended, so output is already
+    # sorted
+    return expanded
+
+
+def note_pitches(note_events, tuning: list[int] | tuple[int, ...]) -> list[int | None]:
+    """MIDI pitch for each note, same as [e.get_pitch(tuning) for e in note_events].
+
+    Applies decode_string_fret()'s range checks inline, so each note is
+    decoded once without building a (string, fret) tuple.
+    """
+    num_strings = min(len(tuning), 15)
+    return [
+        tuning[e.extra - 1] + e.pitch_byte
+        if 1 <= e.extra <= num_strings and 0 <= e.pitch_byte <= 24 else None
+        for e in note_events
+    ]
+
+
+def filter_hammer_on_decorations(note_events, tuning: list[int] | tuple[int, ...], pitches: list[int | None] | None = None):
+    """Drop hammer-on decoration notes (L marker, b6=0).
+
+    These are articulation decorations that shouldn't be separate MIDI notes.
+    Pattern 1: +1 semitone to next note (chromatic approach)
+    Pattern 2: +1 semitone from previous note (hammer-on within a roll)
+
+    Args:
+        note_events: List of note events sorted by position
+        tuning: MIDI pitch per string (1-indexed strings)
+        pitches: Precomputed note_pitches(note_events, tuning), if available
+
+    Returns:
+        List of note events with decorations removed
+    """
+    if pitches is None:
+        pitches = note_pitches(note_events, tuning)
+    # Notes without a usable string/fret get pitch 0 so they never match
+    # a semitone step
+    pitches = [0 if p is None else p for p in pitches]
+
+    # Flag legato and decoration candidates once per note
+    legato = [evt.marker == 'L' for evt in note_events]
+    decoration = [
+        is_legato and bool(evt.raw_data) and evt.raw_data[6] == 0
+        for evt, is_legato in zip(note_events, legato)
+    ]
+
+    last = len(note_events) - 1
+    filtered_events = []
+    for i, evt in enumerate(note_events):
+        if decoration[i]:
+            this_pitch = pitches[i]
+            next_pitch = pitches[i + 1] if i < last else None
+
+            # Check if next note is +1 semitone (chromatic hammer-on target)
+            if next_pitch is not None and next_pitch - this_pitch == 1:
+                continue  # Skip chromatic approach note
+
+            # Check if prev note is -1 semitone AND prev is also an L note
+            # This catches the second note in a hammer-on pair (57→58) regardless of next
+            if i > 0 and legato[i - 1] and this_pitch - pitches[i - 1] == 1:
+                # Check that next note is higher (ascending run continuation)
+                if next_pitch is not None and next_pitch > this_pitch:
+                    continue  # Skip decoration in ascending run
+
+        filtered_events.append(evt)
+    return filtered_events
+
+
+# Instrument name substring -> General MIDI program, checked in priority order
+# GM programs: 24=guitar, 25=acoustic guitar, 32=acoustic bass, 105=banjo
+GM_PROGRAMS = (
+    ('banjo', 105),
+    ('bass', 32),
+    ('mandolin', 25),  # No mandolin in GM, use guitar
+    ('guitar', 25),
+    ('ukulele', 24),
+    ('uke', 24),
+)
+DEFAULT_PROGRAM = 25  # Acoustic guitar
+
+
+def instrument_to_program(inst: TEFInstrument | None) -> int:
+    """Map instrument name to a General MIDI program number."""
+    if inst:
+        name_lower = inst.name.lower()
+        for token, program in GM_PROGRAMS:
+            if token in name_lower:
+                return program
+    return DEFAULT_PROGRAM
+
+
+def tef_to_midi(tef: TEFFile, output_path: Path, melody_only: bool = True, track_filter: int = 0) -> bool:
+    """Convert parsed TEF to MIDI file.
+
+    Args:
+        tef: Parsed TEF file
+        output_path: Output MIDI file path
+        melody_only: If True, only export melody notes
+        track_filter: Track index to export (0=first instrument, -1=all)
+
+    Returns:
+        True if a MIDI file was written, False if there were no notes
+    """
+    # Metadata track: title, tempo
+    meta_track = (
+        track_name_event(tef.title or 'TEF Export') + SET_TEMPO + END_OF_TRACK
+    )
+
+    # Get instrument info for track name and MIDI program
+    if tef.instruments and 0 <= track_filter < len(tef.instruments):
+        inst = tef.instruments[track_filter]
+        track_name = inst.name
+    else:
+        inst = None
+        track_name = 'All Notes' if track_filter < 0 else 'Melody'
+
+    # Get note events, sorted by position
+    # TuxGuitar format: track index in e.track, string in e.extra, fret in e.pitch_byte
+    if melody_only:
+        # Filter by track index (0=banjo, 1=guitar, etc.)
+        # is_melody already guarantees decode_string_fret() succeeds
+        note_events = sorted(
+            [e for e in tef.note_events
+             if e.is_melody
+             and (track_filter < 0 or e.track == track_filter)],
+            key=attrgetter('position')
+        )
+    else:
+        note_events = sorted(
+            [e for e in tef.note_events
+             if track_filter < 0 or e.track == track_filter],
+            key=attrgetter('position')
+        )
+
+    if not note_events:
+        print("No note events found!")
+        return False
+
+    # Get tuning from file (default to Open G if not found)
+    tuning = DEFAULT_TUNING
+    if inst and inst.tuning_pitches:
+        tuning = inst.tuning_pitches
+
+    # Decode each note's pitch with file's tuning once; the hammer-on
+    # filter and the event loop below both reuse it
+    pitches = note_pitches(note_events, tuning)
+    # Clamped to the valid MIDI range; reading-list repeats reuse the same entry
+    pitch_of = {
+        id(evt): None if pitch is None else max(0, min(127, pitch))
+        for evt, pitch in zip(note_events, pitches)
+    }
+
+    # Filter out hammer-on decoration notes (L marker, b6=0)
+    note_events = filter_hammer_on_decorations(note_events, tuning, pitches)
+
+    # Expand notes using reading list if available
+    expanded_notes = expand_notes_with_reading_list(
+        note_events, tef.reading_list, POSITIONS_PER_MEASURE
+    )
+
+    print(f"Source notes: {len(note_events)}, Expanded: {len(expanded_notes)}")
+    if tef.reading_list:
+        print(f"Reading list: {len(tef.reading_list)} entries")
+
+    # Build note on/off events
+    # Calculate durations from gap to next note in one pass
+    # (leave small gap, minimum 60 ticks; default one beat for last note)
+    output_positions = [pos for pos, _ in expanded_notes]
+    durations = [
+        max((next_pos - pos) * TICKS_PER_POSITION - 10, 60)
+        for pos, next_pos in zip(output_positions, output_positions[1:])
+    ]
+    durations.append(240)
+
+    # Note-ons are generated in time order; each note-off waits in a heap
+    # (ordered by tick, then note order) until no earlier event remains.
+    # Events are encoded straight into the track body with running status
+    # (status byte only written when it changes), as mido would save them
+    note_track = bytearray(track_name_event(track_name))
+    note_track += bytes((0, PROGRAM_CHANGE, instrument_to_program(inst)))
+    emit = note_track.extend
+    status = PROGRAM_CHANGE
+    pending_offs = []
+    last_tick = 0
+    for i, (output_pos, evt) in enumerate(expanded_notes):
+        # Convert position (16th notes) to MIDI ticks; a negative position
+        # plays at the start rather than producing a negative delta
+        tick = max(output_pos, 0) * TICKS_PER_POSITION
+
+        pitch = pitch_of[id(evt)]
+        if pitch is None:
+            continue
+
+        # Release notes that end at or before this one starts
+        while pending_offs and pending_offs[0][0] <= tick:
+            off_tick, _, off_pitch = heappop(pending_offs)
+            emit(encode_varlen(off_tick - last_tick))
+            if status != NOTE_OFF:
+                status = NOTE_OFF
+                note_track.append(NOTE_OFF)
+            emit((off_pitch, 0))
+            last_tick = off_tick
+
+        # Note on
+        emit(encode_varlen(tick - last_tick))
+        if status != NOTE_ON:
+            status = NOTE_ON
+            note_track.append(NOTE_ON)
+        emit((pitch, 80))
+        last_tick = tick
+        # Note off based on calculated duration
+        heappush(pending_offs, (tick + durations[i], i, pitch))
+
+    # Release remaining notes
+    while pending_offs:
+        off_tick, _, off_pitch = heappop(pending_offs)
+        emit(encode_varlen(off_tick - last_tick))
+        if status != NOTE_OFF:
+            status = NOTE_OFF
+            note_track.append(NOTE_OFF)
+        emit((off_pitch, 0))
+        last_tick = off_tick
+    note_track += END_OF_TRACK
+
+    write_smf(output_path, [meta_track, note_track])
+    print(f"Wrote {len(expanded_notes)} notes to {output_path}")
+    print(f"Duration: ~{last_tick / 240 / 4:.1f} measures at 160 BPM")
+    return True
@@ -1,28 +1,48 @@
 """OTF (Open Tab Format) exporter for TEF files."""
 
+import io
 import json
 from dataclasses import dataclass, field, asdict
+from functools import lru_cache
+from itertools import groupby
+from operator import itemgetter
 from typing import Any
 
 from .reader import TEFFile, TEFNoteEvent, TEFInstrument
 
+try:
+    import orjson  # Optional, faster JSON encoding
+except ImportError:
+    orjson = None
 
-# MIDI note to pitch name conversion
-MIDI_TO_PITCH = {
-    24: "C1", 25: "C#1", 26: "D1", 27: "D#1", 28: "E1", 29: "F1", 30: "F#1", 31: "G1", 32: "G#1", 33: "A1", 34: "A#1", 35: "B1",
-    36: "C2", 37: "C#2", 38: "D2", 39: "D#2", 40: "E2", 41: "F2", 42: "F#2", 43: "G2", 44: "G#2", 45: "A2", 46: "A#2", 47: "B2",
-    48: "C3", 49: "C#3", 50: "D3", 51: "D#3", 52: "E3", 53: "F3", 54: "F#3", 55: "G3", 56: "G#3", 57: "A3", 58: "A#3", 59: "B3",
-    60: "C4", 61: "C#4", 62: "D4", 63: "D#4", 64: "E4", 65: "F4", 66: "F#4", 67: "G4", 68: "G#4", 69: "A4", 70: "A#4", 71: "B4",
-    72: "C5", 73: "C#5", 74: "D5", 75: "D#5", 76: "E5", 77: "F5", 78: "F#5", 79: "G5", 80: "G#5", 81: "A5", 82: "A#5", 83: "B5",
-}
+
+# JSON backend, chosen once at import. orjson only matches json.dumps
+# layout for two-space indentation, and it writes non-ASCII characters
+# raw where json.dumps escapes them (ensure_ascii), so anything else
+# goes through stdlib json.
+if orjson is not None:
+    def _dumps(obj: Any, indent: int | None) -> str:
+        if indent == 2:
+            text = orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+            if text.isascii():
+                return text
+        return json.dumps(obj, indent=indent)
+else:
+    def _dumps(obj: Any, indent: int | None) -> str:
+        return json.dumps(obj, indent=indent)
+
+
+# MIDI note to pitch name conversion, indexed by MIDI number (60 = C4)
+PITCH_CLASSES = ("C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B")
+PITCH_TABLE = tuple(f"{PITCH_CLASSES[m % 12]}{m // 12 - 1}" for m in range(128))
 
 
 def midi_to_pitch_name(midi: int) -> str:
     """Convert MIDI note number to pitch name (e.g., 62 -> 'D4')."""
-    return MIDI_TO_PITCH.get(midi, f"MIDI{midi}")
+    return PITCH_TABLE[midi] if 0 <= midi < 128 else f"MIDI{midi}"
 
 
-@dataclass
+@dataclass(slots=True)
 class OTFNote:
     """A single note in OTF format."""
     s: int           # String number (1 = highest pitch)
@@ -31,21 +51,21 @@ class OTFNote:
     dur: int | None = None   # Duration in ticks (for sustained notes)
 
 
-@dataclass
+@dataclass(slots=True)
 class OTFEvent:
     """A note event at a specific tick position."""
     tick: int
     notes: list[OTFNote] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class OTFMeasure:
     """A measure containing note events."""
     measure: int
     events: list[OTFEvent] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class OTFTrack:
     """A track/instrument in OTF format."""
     id: str
@@ -55,13 +75,13 @@ class OTFTrack:
     role: str = "lead"
 
 
-@dataclass
+@dataclass(slots=True)
 class OTFTiming:
     """Timing configuration."""
     ticks_per_beat: int = 480
 
 
-@dataclass
+@dataclass(slots=True)
 class OTFMetadata:
     """Song metadata."""
     title: str = ""
@@ -72,14 +92,14 @@ class OTFMetadata:
     tempo: int = 120
 
 
-@dataclass
+@dataclass(slots=True)
 class OTFReadingListEntry:
     """Reading list entry for playback order."""
     from_measure: int
     to_measure: int
 
 
-@dataclass
+@dataclass(slots=True)
 class OTFDocument:
     """Complete OTF document."""
     otf_version: str = "1.0"
@@ -89,8 +109,12 @@ class OTFDocument:
     notation: dict[str, list[OTFMeasure]] = field(default_factory=dict)
     reading_list: list[OTFReadingListEntry] = field(default_factory=list)
 
-    def to_dict(self) -> dict[str, Any]:
-        """Convert to dictionary for YAML/JSON serialization."""
+    def to_dict(self, include_notation: bool = True) -> dict[str, Any]:
+        """Convert to dictionary for YAML/JSON serialization.
+
+        Args:
+            include_notation: If False, "notation" is left as an empty dict
+        """
         result = {
             "otf_version": self.otf_version,
             "metadata": {
@@ -122,21 +146,9 @@ class OTFDocument:
             })
 
         # Add notation per track
-        for track_id, measures in self.notation.items():
-            result["notation"][track_id] = []
-            for measure in measures:
-                m = {"measure": measure.measure, "events": []}
-                for event in measure.events:
-                    e = {"tick": event.tick, "notes": []}
-                    for note in event.notes:
-                        n = {"s": note.s, "f": note.f}
-                        if note.tech:
-                            n["tech"] = note.tech
-                        if note.dur:
-                            n["dur"] = note.dur
-                        e["notes"].append(n)
-                    m["events"].append(e)
-                result["notation"][track_id].append(m)
+        if include_notation:
+            for track_id, measures in self.notation.items():
+                result["notation"][track_id] = [measure_to_dict(m) for m in measures]
 
         # Add reading list if present
         if self.reading_list:
@@ -147,70 +159,228 @@ class OTFDocument:
 
         return result
 
-    def to_yaml(self) -> str:
-        """Convert to YAML string."""
+    def to_yaml(self, fast: bool = False) -> str:
+        """Convert to YAML string (see write_yaml() for fast)."""
+        buf = io.StringIO()
+        self.write_yaml(buf, fast=fast)
+        return buf.getvalue()
+
+    def to_json(self, indent: int = 2) -> str:
+        """Convert to JSON string."""
+        return _dumps(self.to_dict(), indent)
+
+    def write_json(self, fp, indent: int | None = 2):
+        """Write JSON to fp, encoding one measure at a time.
+
+        Output is identical to json.dumps(self.to_dict(), indent=indent),
+        without building the full notation tree first. With orjson
+        installed, indent=2 output comes from to_json() instead, which
+        is faster than streaming through the stdlib encoder and falls
+        back to json.dumps when the text is not pure ASCII.
+        """
+        if indent == 2 and orjson is not None:
+            fp.write(self.to_json(indent))
+            return
+
+        # Everything but notation is small; encode it once and stream the
+        # measures into the empty notation placeholder
+        head, placeholder, tail = json.dumps(
+            self.to_dict(include_notation=False), indent=indent
+        ).partition('"notation": {}')
+        fp.write(head)
+        if not self.notation:
+            fp.write(placeholder)
+            fp.write(tail)
+            return
+
+        encode = json.JSONEncoder(indent=indent).encode
+        if indent is None:
+            encode_measure = measure_json_encoder(None, 0)
+            fp.write('"notation": {')
+            for i, (track_id, measures) in enumerate(self.notation.items()):
+                if i:
+                    fp.write(", ")
+                fp.write(encode(track_id) + ": [")
+                fp.write(", ".join(map(encode_measure, measures)))
+                fp.write("]")
+            fp.write("}")
+        else:
+            # Measures sit three levels deep: root -> notation -> track
+            track_pad = "\n" + " " * (2 * indent)
+            measure_pad = "\n" + " " * (3 * indent)
+            encode_measure = measure_json_encoder(indent, 3)
+            fp.write('"notation": {')
+            for i, (track_id, measures) in enumerate(self.notation.items()):
+                if i:
+                    fp.write(",")
+                fp.write(track_pad + encode(track_id) + ": [")
+                if measures:
+                    for j, m in enumerate(measures):
+                        if j:
+                            fp.write(",")
+                        fp.write(measure_pad)
+                        fp.write(encode_measure(m))
+                    fp.write(track_pad)
+                fp.write("]")
+            fp.write("\n" + " " * indent + "}")
+        fp.write(tail)
+
+    def write_yaml(self, fp, fast: bool = False):
+        """Write YAML to fp (same text as to_yaml()).
+
+        The default pure-Python dumper keeps output byte-stable. With
+        fast=True, libyaml's C emitter is used when available; its output
+        loads to the same data but can differ in quoting and line
+        wrapping (tabs, emoji, long escaped strings).
+        """
         try:
             import yaml
-            return yaml.dump(self.to_dict(), default_flow_style=False, sort_keys=False, allow_unicode=True)
+            dumper = yaml.Dumper
+            if fast:
+                dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+            yaml.dump(self.to_dict(), fp, Dumper=dumper, default_flow_style=False, sort_keys=False, allow_unicode=True)
         except ImportError:
             # Fallback to JSON if yaml not available
-            return self.to_json()
+            fp.write(self.to_json())
 
-    def to_json(self, indent: int = 2) -> str:
-        """Convert to JSON string."""
-        return json.dumps(self.to_dict(), indent=indent)
 
+def note_to_dict(note: OTFNote) -> dict[str, Any]:
+    """Convert one note to its notation dict (optional fields only if set)."""
+    n = {"s": note.s, "f": note.f}
+    if note.tech:
+        n["tech"] = note.tech
+    if note.dur:
+        n["dur"] = note.dur
+    return n
 
-def instrument_to_otf_id(inst: TEFInstrument) -> str:
-    """Generate a clean ID from instrument name."""
-    name = inst.name.lower()
-    # Remove common suffixes
-    for suffix in [" open g", " standard", " gdae", " gda"]:
-        name = name.replace(suffix, "")
-    # Replace spaces with hyphens
-    name = name.replace(" ", "-")
-    return name
 
+def measure_json_encoder(indent: int | None, level: int):
+    """Build a function that encodes one OTFMeasure as JSON text.
+
+    The text matches json.dumps(measure_to_dict(m), indent=indent) for a
+    measure nested `level` levels deep, but is written directly from the
+    dataclasses without building the intermediate dicts.
+    """
+    if indent is None:
+        sep = ", "
+        pad = [""] * 6
+    else:
+        sep = ","
+        pad = ["\n" + " " * (indent * (level + k)) for k in range(6)]
+
+    def encode_list(items: list[str], item_pad: str, close_pad: str) -> str:
+        if not items:
+            return "[]"
+        return "[" + item_pad + (sep + item_pad).join(items) + close_pad + "]"
+
+    note_s = "{" + pad[5] + '"s": '
+    note_f = sep + pad[5] + '"f": '
+    note_tech = sep + pad[5] + '"tech": '
+    note_dur = sep + pad[5] + '"dur": '
+    note_close = pad[4] + "}"
+
+    def encode_note(n: OTFNote) -> str:
+        text = f"{note_s}{n.s}{note_f}{n.f}"
+        if n.tech:
+            text += note_tech + json.dumps(n.tech)
+        if n.dur:
+            text += f"{note_dur}{n.dur}"
+        return text + note_close
+
+    event_tick = "{" + pad[3] + '"tick": '
+    event_notes = sep + pad[3] + '"notes": '
+    event_close = pad[2] + "}"
+
+    def encode_event(e: OTFEvent) -> str:
+        notes = encode_list([encode_note(n) for n in e.notes], pad[4], pad[3])
+        return f"{event_tick}{e.tick}{event_notes}{notes}{event_close}"
+
+    measure_num = "{" + pad[1] + '"measure": '
+    measure_events = sep + pad[1] + '"events": '
+    measure_close = pad[0] + "}"
+
+    def encode_measure(m: OTFMeasure) -> str:
+        events = encode_list([encode_event(e) for e in m.events], pad[2], pad[1])
+        return f"{measure_num}{m.measure}{measure_events}{events}{measure_close}"
+
+    return encode_measure
+
+
+def measure_to_dict(measure: OTFMeasure) -> dict[str, Any]:
+    """Convert one measure to its notation dict."""
+    # Most notes carry neither tech nor dur; build those dicts inline
+    return {
+        "measure": measure.measure,
+        "events": [
+            {
+                "tick": event.tick,
+                "notes": [
+                    note_to_dict(n) if n.tech or n.dur else {"s": n.s, "f": n.f}
+                    for n in event.notes
+                ],
+            }
+            for event in measure.events
+        ],
+    }
+
+
+@lru_cache(maxsize=256)
+def _classify_instrument(name: str, num_strings: int) -> tuple[str, str, str]:
+    """(otf_id, instrument type, role) for an instrument name, lowercased once."""
+    name = name.lower()
+
+    # ID: remove common suffixes, replace spaces with hyphens
+    otf_id = name
+    for suffix in [" open g", " standard", " gdae", " gda"]:
+        otf_id = otf_id.replace(suffix, "")
+    otf_id = otf_id.replace(" ", "-")
 
-def instrument_to_type(inst: TEFInstrument) -> str:
-    """Map instrument name to standard type identifier."""
-    name = inst.name.lower()
     if "banjo" in name:
-        return "5-string-banjo"
+        inst_type = "5-string-banjo"
     elif "mandolin" in name:
-        return "mandolin"
+        inst_type = "mandolin"
     elif "guitar" in name:
-        return "6-string-guitar"
+        inst_type = "6-string-guitar"
     elif "bass" in name:
-        return "upright-bass"
+        inst_type = "upright-bass"
     elif "dobro" in name or "resonator" in name:
-        return "dobro"
+        inst_type = "dobro"
     elif "fiddle" in name or "violin" in name:
-        return "fiddle"
+        inst_type = "fiddle"
     else:
-        return f"{inst.num_strings}-string"
+        inst_type = f"{num_strings}-string"
+
+    role = "lead" if "banjo" in name or "mandolin" in name else "rhythm"
+    return otf_id, inst_type, role
+
+
+def instrument_to_otf_id(inst: TEFInstrument) -> str:
+    """Generate a clean ID from instrument name."""
+    return _classify_instrument(inst.name, inst.num_strings)[0]
+
+
+def instrument_to_type(inst: TEFInstrument) -> str:
+    """Map instrument name to standard type identifier."""
+    return _classify_instrument(inst.name, inst.num_strings)[1]
+
+
+# raw_data[5] articulation byte -> OTF technique code, for every byte value
+# (none, hammer-on, pull-off, slide; anything else has no technique)
+ART_TO_TECH = (None, "h", "p", "/") + (None,) * 252
 
 
 def technique_from_event(event: TEFNoteEvent) -> str | None:
     """Map TEF articulation to OTF technique code."""
-    art = event.extra  # In new format, articulation is stored elsewhere
-    marker = event.marker
-
     # Check marker first
-    if marker == 'L':  # Legato
+    if event.marker == 'L':  # Legato
         # Could be hammer-on or pull-off based on context
         # For now, mark as legato
         return "h"  # Default to hammer-on for legato
 
     # Check articulation byte from raw_data if available
-    if event.raw_data and len(event.raw_data) > 5:
-        art_byte = event.raw_data[5]
-        if art_byte == 1:
-            return "h"  # Hammer-on
-        elif art_byte == 2:
-            return "p"  # Pull-off
-        elif art_byte == 3:
-            return "/"  # Slide
+    raw = event.raw_data
+    if raw and len(raw) > 5:
+        return ART_TO_TECH[raw[5]]
 
     return None
 
@@ -240,12 +410,12 @@ def tef_to_otf(tef: TEFFile) -> OTFDocument:
 
     # Tracks from instruments
     for inst in tef.instruments:
-        track_id = instrument_to_otf_id(inst)
+        track_id, inst_type, role = _classify_instrument(inst.name, inst.num_strings)
         track = OTFTrack(
             id=track_id,
-            instrument=instrument_to_type(inst),
+            instrument=inst_type,
             tuning=[midi_to_pitch_name(p) for p in inst.tuning_pitches],
-            role="lead" if "banjo" in inst.name.lower() or "mandolin" in inst.name.lower() else "rhythm",
+            role=role,
         )
         doc.tracks.append(track)
 
@@ -256,63 +426,43 @@ def tef_to_otf(tef: TEFFile) -> OTFDocument:
     TICKS_PER_POSITION = 60
     POSITIONS_PER_MEASURE = 16
 
-    track_events: dict[str, dict[int, list[tuple[int, TEFNoteEvent]]]] = {}
-
+    # Number tracks in order of first appearance (the order notation keys
+    # are written in), then sort once by (track, position). The sort is
+    # stable, so chord notes keep file order; measure and tick both follow
+    # from position, so each level is a contiguous run in the sorted list.
+    track_ids = [track.id for track in doc.tracks]
+    track_rank: dict[str, int] = {}
+    melody: list[tuple[int, TEFNoteEvent]] = []
     for event in tef.note_events:
         if not event.is_melody:
             continue
+        track_id = track_ids[event.track] if event.track < len(track_ids) else "unknown"
+        melody.append((track_rank.setdefault(track_id, len(track_rank)), event))
+    melody.sort(key=lambda item: (item[0], item[1].position))
+    ranked_ids = list(track_rank)
 
-        # Get track ID
-        if event.track < len(doc.tracks):
-            track_id = doc.tracks[event.track].id
-        else:
-            track_id = "unknown"
+    def measure_of(item):
+        return item[1].position // POSITIONS_PER_MEASURE + 1
 
-        if track_id not in track_events:
-            track_events[track_id] = {}
-
-        # Calculate measure and tick within measure
-        measure = (event.position // POSITIONS_PER_MEASURE) + 1
-        position_in_measure = event.position % POSITIONS_PER_MEASURE
-        tick = position_in_measure * TICKS_PER_POSITION
-
-        if measure not in track_events[track_id]:
-            track_events[track_id][measure] = []
-
-        track_events[track_id][measure].append((tick, event))
+    def position_in_measure(item):
+        return item[1].position % POSITIONS_PER_MEASURE
 
     # Build notation structure
-    for track_id, measures in track_events.items():
-        doc.notation[track_id] = []
-
-        for measure_num in sorted(measures.keys()):
-            events = measures[measure_num]
-
-            # Group events by tick position (for chords)
-            events_by_tick: dict[int, list[TEFNoteEvent]] = {}
-            for tick, evt in events:
-                if tick not in events_by_tick:
-                    events_by_tick[tick] = []
-                events_by_tick[tick].append(evt)
-
-            otf_measure = OTFMeasure(measure=measure_num)
-
-            for tick in sorted(events_by_tick.keys()):
-                otf_event = OTFEvent(tick=tick)
-
-                for evt in events_by_tick[tick]:
-                    result = evt.decode_string_fret()
-                    if result:
-                        string, fret = result
-                        tech = technique_from_event(evt)
-                        note = OTFNote(s=string, f=fret, tech=tech)
-                        otf_event.notes.append(note)
-
-                if otf_event.notes:
-                    otf_measure.events.append(otf_event)
-
-            if otf_measure.events:
-                doc.notation[track_id].append(otf_measure)
+    for rank, track_items in groupby(melody, key=itemgetter(0)):
+        measures = doc.notation[ranked_ids[rank]] = []
+
+        for measure_num, measure_items in groupby(track_items, key=measure_of):
+            # Group events by tick position (for chords). is_melody already
+            # validated string (extra) and fret (pitch_byte), which is all
+            # decode_string_fret() checks, so every event gets its notes
+            otf_measure = OTFMeasure(measure=measure_num, events=[
+                OTFEvent(tick=pos * TICKS_PER_POSITION, notes=[
+                    OTFNote(s=evt.extra, f=evt.pitch_byte, tech=technique_from_event(evt))
+                    for _, evt in tick_items
+                ])
+                for pos, tick_items in groupby(measure_items, key=position_in_measure)
+            ])
+            measures.append(otf_measure)
 
     # Reading list
     for entry in tef.reading_list:
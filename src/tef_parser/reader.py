@@ -2,9 +2,99 @@
 
 from dataclasses import dataclass, field
 from pathlib import Path
+import mmap
+import re
 import struct
 
 
+# Files at least this large are memory-mapped instead of read into memory
+MMAP_THRESHOLD = 1 << 20
+
+U16 = struct.Struct('<H')  # Little-endian unsigned short
+U32 = struct.Struct('<I')  # Little-endian unsigned int
+U16_PAIR = struct.Struct('<HH')  # Two little-endian unsigned shorts
+
+# V3 component record: location (bytes 0-3), component type (byte 4),
+# marker (byte 5), then 6 component-specific bytes
+COMPONENT_RECORD = struct.Struct('<IBB6x')
+# V2 component record: location (bytes 0-1), type+fret (byte 2), then
+# duration and effect1 (unused here) and effect2 (byte 5)
+V2_RECORD = struct.Struct('<BBB2xB')
+
+# Length-prefixed strings: 2-byte little-endian length 3-100, so the high
+# byte is 0. Lookahead matches every (overlapping) candidate offset.
+STRING_PREFIX_RE = re.compile(rb'(?=[\x03-\x64]\x00)')
+# Chord names: note letter alone, or followed by a common suffix
+# (m, 7, maj, min, dim, aug, #, b, sus); short (<= 10 chars), no spaces
+CHORD_NAME_RE = re.compile(r'[A-G](?:[m7#b][^ ]{0,8}|(?:dim|aug|sus)[^ ]{0,6})?')
+# Known instrument patterns with typical string counts, in priority order
+# Format: (name_pattern, default_strings)
+# Include both capitalized and lowercase versions
+INSTRUMENT_PATTERNS = (
+    (b"Mandolin", 4),
+    (b"mandolin", 4),
+    (b"Banjo open G", 5),
+    (b"banjo open G", 5),
+    (b"Banjo", 5),
+    (b"banjo", 5),
+    (b"Guitar Standard", 6),
+    (b"guitar standard", 6),
+    (b"Guitar", 6),
+    (b"guitar", 6),
+    (b"Bass", 4),
+    (b"bass", 4),
+    (b"Ukulele", 4),
+    (b"ukulele", 4),
+)
+# Zero-width match at every offset where any pattern starts
+INSTRUMENT_NAME_RE = re.compile(
+    b"(?=" + b"|".join(re.escape(name) for name, _ in INSTRUMENT_PATTERNS) + b")"
+)
+# Valid 'I'/'F'/'L' markers 12 bytes apart (byte 11 of adjacent records)
+MARKER_PAIR_RE = re.compile(rb'(?=[IFL].{11}[IFL])', re.DOTALL)
+# Delete tables for bytes.translate: what is left is the disallowed bytes
+PRINTABLE_OR_NUL = bytes([0, *range(32, 127)])
+NON_LETTERS = bytes(b for b in range(256) if not chr(b).isascii() or not chr(b).isalpha())
+# Non-note component types (from TuxGuitar TEInputStream.java)
+NON_NOTE_TYPES = frozenset({0x33, 0x35, 0x36, 0x37, 0x38, 0x39, 0x3D,
+                            0x75, 0x78, 0x7D, 0x7E, 0xB6, 0xB7, 0xBD, 0xBE, 0xFD, 0xFE})
+NON_NOTE_COMPONENT = -1  # Known non-note type: skipped
+INVALID_COMPONENT = -2   # Neither a note nor a known type: counts toward end of region
+# Fret per V3 component type: notes have fret + 1 (1-25) in bits 0-4
+COMPONENT_FRETS = tuple(
+    NON_NOTE_COMPONENT if t in NON_NOTE_TYPES
+    else (t & 0x1f) - 1 if 0x01 <= t & 0x1f <= 0x19
+    else INVALID_COMPONENT
+    for t in range(256)
+)
+# Note marker per record byte: printable ASCII as-is (I, F, L, C, @, A, ...),
+# anything else treated as 'F'
+MARKER_CHARS = tuple(chr(b) if 32 <= b <= 126 else 'F' for b in range(256))
+# TEFNoteEvent.articulation names, indexed by the articulation value
+ARTICULATIONS = ('normal', 'hammer-on', 'pull-off', 'slide')
+# Open G banjo: D4, B3, G3, D3, g4 (used when a file has no tuning)
+DEFAULT_TUNING = (62, 59, 55, 50, 67)
+
+
+def track_string_table(track_string_counts: list[int], num_cumulative: int) -> list[tuple[int, int]]:
+    """Map each cumulative string index to its (track index, 0-indexed local string).
+
+    Tracks own consecutive strings in order. An index past the last track
+    maps to track 0 with the local string counted on past the total.
+    """
+    table = []
+    for cumulative_string in range(num_cumulative):
+        track_idx = 0
+        local_string = cumulative_string
+        for idx, num_strings in enumerate(track_string_counts):
+            if local_string < num_strings:
+                track_idx = idx
+                break
+            local_string -= num_strings
+        table.append((track_idx, local_string))
+    return table
+
+
 class TEFVersionError(Exception):
     """Raised when a TEF file version is not supported."""
 
@@ -15,7 +105,7 @@ class TEFVersionError(Exception):
         super().__init__(message)
 
 
-@dataclass
+@dataclass(slots=True)
 class TEFHeader:
     """TEF file header information."""
     format_id: int          # Bytes 0-1: format identifier (0x0010 for v3, 0 for v2)
@@ -52,7 +142,7 @@ class TEFHeader:
         return (256 * self.v2_time_num) // self.v2_time_denom
 
 
-@dataclass
+@dataclass(slots=True)
 class TEFString:
     """A string extracted from the TEF file."""
     offset: int
@@ -60,7 +150,7 @@ class TEFString:
     length: int
 
 
-@dataclass
+@dataclass(slots=True)
 class TEFInstrument:
     """Instrument definition from TEF file."""
     name: str
@@ -70,21 +160,21 @@ class TEFInstrument:
     offset: int
 
 
-@dataclass
+@dataclass(slots=True)
 class TEFChord:
     """Chord definition from TEF file."""
     name: str
     offset: int
 
 
-@dataclass
+@dataclass(slots=True)
 class TEFSection:
     """Section marker (e.g., "A Part", "B Part")."""
     name: str
     offset: int
 
 
-@dataclass
+@dataclass(slots=True)
 class TEFReadingListEntry:
     """Reading list entry for MIDI playback order.
 
@@ -102,7 +192,7 @@ class TEFReadingListEntry:
     offset: int          # File offset where entry was found
 
 
-@dataclass
+@dataclass(slots=True)
 class TEFNoteEvent:
     """A note event from the TEF file.
 
@@ -127,7 +217,7 @@ class TEFNoteEvent:
     @property
     def articulation(self) -> str:
         """Human-readable articulation type."""
-        return {0: 'normal', 1: 'hammer-on', 2: 'pull-off', 3: 'slide'}.get(self.extra, 'unknown')
+        return ARTICULATIONS[self.extra] if 0 <= self.extra < 4 else 'unknown'
 
     @property
     def b6(self) -> int:
@@ -180,7 +270,7 @@ class TEFNoteEvent:
 
         return (self.extra, self.pitch_byte)
 
-    def get_pitch(self, tuning: list[int] | None = None) -> int | None:
+    def get_pitch(self, tuning: list[int] | tuple[int, ...] | None = None) -> int | None:
         """Calculate MIDI pitch from string/fret.
 
         Args:
@@ -188,7 +278,7 @@ class TEFNoteEvent:
                     [D4=62, B3=59, G3=55, D3=50, g4=67]
         """
         if tuning is None:
-            tuning = [62, 59, 55, 50, 67]  # Open G banjo: D4, B3, G3, D3, g4
+            tuning = DEFAULT_TUNING
 
         result = self.decode_string_fret()
         if result is None:
@@ -201,7 +291,7 @@ class TEFNoteEvent:
         return tuning[string - 1] + fret
 
 
-@dataclass
+@dataclass(slots=True)
 class TEFFile:
     """Parsed TEF file contents."""
     path: Path
@@ -249,38 +339,25 @@ class TEFFile:
             lines.append("")
             lines.append(f"Note Events: {len(self.note_events)} events")
 
-            # Count melody vs accompaniment
+            # Count melody vs accompaniment (accompaniment is the remainder)
             melody_events = [e for e in self.note_events if e.is_melody]
-            accomp_events = [e for e in self.note_events if not e.is_melody]
-            lines.append(f"  Melody: {len(melody_events)}, Accompaniment: {len(accomp_events)}")
+            lines.append(f"  Melody: {len(melody_events)}, Accompaniment: {len(self.note_events) - len(melody_events)}")
 
-            # Decode stats
-            decoded = [e for e in melody_events if e.decode_string_fret() is not None]
-            lines.append(f"  Successfully decoded: {len(decoded)}/{len(melody_events)} melody notes")
+            # Decode stats (is_melody applies the same range checks as
+            # decode_string_fret(), so every melody note decodes)
+            melody_count = len(melody_events)
+            lines.append(f"  Successfully decoded: {melody_count}/{melody_count} melody notes")
 
-            # Group by position to show structure
-            positions = {}
-            for evt in self.note_events:
-                positions.setdefault(evt.position, []).append(evt)
-            lines.append(f"  Unique positions: {len(positions)}")
+            # Count distinct positions to show structure
+            lines.append(f"  Unique positions: {len({evt.position for evt in self.note_events})}")
 
             # Show first few with decoded info
             lines.append("  First 15 melody notes:")
-            shown = 0
-            for evt in self.note_events:
-                if not evt.is_melody:
-                    continue
-                result = evt.decode_string_fret()
-                if result:
-                    string, fret = result
-                    pitch = evt.get_pitch()
-                    art = f" ({evt.articulation})" if evt.extra != 0 else ""
-                    lines.append(f"    tick {evt.position:4d}: s{string} f{fret} = MIDI {pitch}{art}")
-                else:
-                    lines.append(f"    tick {evt.position:4d}: [decode failed] b9={evt.b9} b11={evt.b11}")
-                shown += 1
-                if shown >= 15:
-                    break
+            for evt in melody_events[:15]:
+                string, fret = evt.decode_string_fret()
+                pitch = evt.get_pitch()
+                art = f" ({evt.articulation})" if evt.extra != 0 else ""
+                lines.append(f"    tick {evt.position:4d}: s{string} f{fret} = MIDI {pitch}{art}")
 
         return "\n".join(lines)
 
@@ -290,8 +367,32 @@ class TEFReader:
 
     def __init__(self, path: str | Path):
         self.path = Path(path)
-        self.data = self.path.read_bytes()
+        if self.path.stat().st_size >= MMAP_THRESHOLD:
+            # Large files: let the OS page in only the regions we touch.
+            # Slices of the map are bytes, like slices of read_bytes()
+            with open(self.path, 'rb') as f:
+                self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self.data = self.path.read_bytes()
         self.pos = 0
+        # Scan results shared by the parse_* methods (computed on first use)
+        self._strings: list[TEFString] | None = None
+        self._instruments: list[TEFInstrument] | None = None
+        self._component_offset: int | None = None
+
+    def close(self):
+        """Release the memory map of a large file (no-op for small files).
+
+        Parsed results stay valid; only further parse_* calls need the data.
+        """
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
 
     def read_header(self) -> TEFHeader:
         """Parse the TEF header.
@@ -309,7 +410,7 @@ class TEFReader:
             # Parse null-terminated strings at the start
             return self._read_v2_header()
 
-        format_id = struct.unpack("<H", raw[0:2])[0]
+        format_id = U16.unpack_from(raw, 0)[0]
         version_minor = raw[2]
         version_major = raw[3]
 
@@ -364,15 +465,15 @@ class TEFReader:
         comments = strings[2] if len(strings) > 2 else ""
 
         # Parse structured header fields (starting at offset 200)
-        measures = struct.unpack('<H', self.data[200:202])[0]
+        measures = U16.unpack_from(self.data, 200)[0]
         time_num = self.data[202]
         time_denom = self.data[204]
-        tempo = struct.unpack('<H', self.data[220:222])[0]
+        tempo = U16.unpack_from(self.data, 220)[0]
         num_strings = self.data[240]
         num_tracks = self.data[241] + 1
 
         # Component count at offset 256
-        component_count = struct.unpack('<H', self.data[256:258])[0]
+        component_count = U16.unpack_from(self.data, 256)[0]
         component_offset = 258  # Components start right after count
 
         return TEFHeader(
@@ -399,29 +500,35 @@ class TEFReader:
 
         TEF uses 2-byte little-endian length prefix followed by string data.
         Some strings are null-terminated, some are not.
+
+        The scan runs once per reader; later calls return the same list.
         """
+        if self._strings is not None:
+            return self._strings
+
+        data = self.data
         strings = []
-        i = 0
-        while i < len(self.data) - 2:
-            # Try 2-byte length prefix (little-endian)
-            length = struct.unpack("<H", self.data[i:i+2])[0]
-            if 3 <= length <= 100 and i + 2 + length <= len(self.data):
-                candidate = self.data[i + 2:i + 2 + length]
-                # Strip trailing null if present
-                if candidate and candidate[-1] == 0:
-                    candidate = candidate[:-1]
-                # Check if it's printable ASCII (including common punctuation)
-                if candidate and all(32 <= b < 127 or b in (0,) for b in candidate):
-                    try:
-                        value = candidate.decode('ascii').rstrip('\x00')
-                        # Filter: require at least one letter, not all digits
-                        if value and any(c.isalpha() for c in value):
-                            strings.append(TEFString(offset=i, value=value, length=length))
-                            i += 2 + length
-                            continue
-                    except UnicodeDecodeError:
-                        pass
-            i += 1
+        next_offset = 0  # Scanning resumes after the last string found
+        # Only offsets whose length prefix is 3-100 can start a string
+        for match in STRING_PREFIX_RE.finditer(data):
+            i = match.start()
+            if i < next_offset:
+                continue
+            length = data[i]
+            if i + 2 + length > len(data):
+                continue
+            candidate = data[i + 2:i + 2 + length]
+            # Strip trailing null if present
+            if candidate[-1] == 0:
+                candidate = candidate[:-1]
+            # Printable ASCII (including common punctuation) or null bytes only,
+            # with at least one letter
+            if candidate.translate(None, PRINTABLE_OR_NUL) or not candidate.translate(None, NON_LETTERS):
+                continue
+            value = candidate.decode('ascii').rstrip('\x00')
+            strings.append(TEFString(offset=i, value=value, length=length))
+            next_offset = i + 2 + length
+        self._strings = strings
         return strings
 
     def find_section_marker(self, marker: bytes = b"debtG") -> int:
@@ -440,183 +547,166 @@ class TEFReader:
         To distinguish real instruments from text mentions, we require:
         1. Instrument name followed by null byte
         2. Then a valid tuning name (short, no spaces)
+
+        The scan runs once per reader; later calls return the same list.
         """
-        instruments = []
+        if self._instruments is not None:
+            return self._instruments
 
-        # Known instrument patterns with typical string counts
-        # Format: (name_pattern, default_strings)
-        # Include both capitalized and lowercase versions
-        instrument_patterns = [
-            (b"Mandolin", 4),
-            (b"mandolin", 4),
-            (b"Banjo open G", 5),
-            (b"banjo open G", 5),
-            (b"Banjo", 5),
-            (b"banjo", 5),
-            (b"Guitar Standard", 6),
-            (b"guitar standard", 6),
-            (b"Guitar", 6),
-            (b"guitar", 6),
-            (b"Bass", 4),
-            (b"bass", 4),
-            (b"Ukulele", 4),
-            (b"ukulele", 4),
-        ]
+        instruments = []
 
         found_offsets = set()  # Avoid duplicates
 
-        for name_pattern, default_strings in instrument_patterns:
-            # Search for all occurrences
-            idx = 0
-            while True:
-                idx = self.data.find(name_pattern, idx)
-                if idx < 0:
-                    break
+        # All occurrences of every pattern, visited in pattern priority
+        # order and then by offset
+        data = self.data
+        candidates = sorted(
+            (priority, idx, name_pattern, default_strings)
+            for idx in (m.start() for m in INSTRUMENT_NAME_RE.finditer(data))
+            for priority, (name_pattern, default_strings) in enumerate(INSTRUMENT_PATTERNS)
+            if data[idx:idx + len(name_pattern)] == name_pattern  # mmap has no startswith()
+        )
 
-                # Skip if too close to a previously found instrument
-                if any(abs(idx - off) < 50 for off in found_offsets):
-                    idx += 1
-                    continue
+        for _, idx, name_pattern, default_strings in candidates:
+            # Skip if too close to a previously found instrument
+            if any(abs(idx - off) < 50 for off in found_offsets):
+                continue
 
-                # Verify this is a real instrument record:
-                # 1. Must be followed by null byte
-                name_end = idx + len(name_pattern)
-                if name_end >= len(self.data) or self.data[name_end] != 0:
-                    idx += 1
-                    continue
+            # Verify this is a real instrument record:
+            # 1. Must be followed by null byte
+            name_end = idx + len(name_pattern)
+            if name_end >= len(self.data) or self.data[name_end] != 0:
+                continue
 
-                # 2. Should be followed by either:
-                #    - A tuning name (short string, no spaces) then null
-                #    - Just nulls (no tuning name stored)
-                tuning_name_start = name_end + 1
-                tuning_name_end = tuning_name_start
-                while tuning_name_end < len(self.data) and tuning_name_end < tuning_name_start + 20:
-                    if self.data[tuning_name_end] == 0:
-                        break
-                    tuning_name_end += 1
-
-                tuning_name = ""
-                if tuning_name_end > tuning_name_start:
-                    tuning_name_bytes = self.data[tuning_name_start:tuning_name_end]
-                    # Tuning name should be short, printable (e.g., "GDAE", "Standard", "r Standard")
-                    try:
-                        tuning_name = tuning_name_bytes.decode('ascii')
-                        # Tuning names can have spaces (e.g., "r Standard") but shouldn't be too long
-                        # or contain sentence-like text (more than 2 spaces = probably not a tuning name)
-                        if len(tuning_name) > 20 or tuning_name.count(' ') > 2:
-                            idx += 1
-                            continue
-                    except UnicodeDecodeError:
-                        idx += 1
+            # 2. Should be followed by either:
+            #    - A tuning name (short string, no spaces) then null
+            #    - Just nulls (no tuning name stored)
+            tuning_name_start = name_end + 1
+            # Null terminator within 20 bytes, else the 20-byte (or EOF) limit
+            tuning_name_end = data.find(b'\x00', tuning_name_start, tuning_name_start + 20)
+            if tuning_name_end < 0:
+                tuning_name_end = min(len(data), tuning_name_start + 20)
+
+            tuning_name = ""
+            if tuning_name_end > tuning_name_start:
+                tuning_name_bytes = self.data[tuning_name_start:tuning_name_end]
+                # Tuning name should be short, printable (e.g., "GDAE", "Standard", "r Standard")
+                try:
+                    tuning_name = tuning_name_bytes.decode('ascii')
+                    # Tuning names can have spaces (e.g., "r Standard") but shouldn't be too long
+                    # or contain sentence-like text (more than 2 spaces = probably not a tuning name)
+                    if len(tuning_name) > 20 or tuning_name.count(' ') > 2:
                         continue
-                # If no tuning name (just nulls), that's OK - some files don't have them
-
-                # Get the actual instrument name
-                name = name_pattern.decode('ascii')
-
-                # Now find the tuning bytes by looking backwards
-                # The format has tuning bytes (one per string) before the name
-                # First, look for the num_strings indicator
-
-                # Look back to find tuning bytes
-                # Tuning bytes are typically in range 0x14-0x60 (valid MIDI: 96-byte = 36-82)
-                pos = idx - 1
-
-                # Skip nulls and padding
-                while pos > 0 and self.data[pos] == 0:
-                    pos -= 1
-
-                # Skip uniform bytes (velocity field - typically 6 bytes all same value)
-                if pos >= 3:
-                    uniform_val = self.data[pos]
-                    if 0 < uniform_val < 128:
-                        uniform_count = 0
-                        check_pos = pos
-                        while check_pos > 0 and self.data[check_pos] == uniform_val:
-                            uniform_count += 1
-                            check_pos -= 1
-                        if uniform_count >= 4:
-                            pos -= uniform_count
-
-                # After velocity, check if there's a null separator before tuning
-                # Pattern 1: [tuning bytes][velocity bytes] - no separator
-                # Pattern 2: [tuning bytes][null][extra bytes][velocity bytes] - has separator
-                #
-                # Look for null within a small window; if found, tuning is before it
-                num_strings = default_strings
-                tuning_pitches = []
-
-                # Check if there's a null within next few bytes (separator pattern)
-                null_pos = -1
-                for check in range(pos, max(pos - 3, 0), -1):
-                    if self.data[check] == 0:
-                        null_pos = check
-                        break
+                except UnicodeDecodeError:
+                    continue
+            # If no tuning name (just nulls), that's OK - some files don't have them
+
+            # Get the actual instrument name
+            name = name_pattern.decode('ascii')
+
+            # Now find the tuning bytes by looking backwards
+            # The format has tuning bytes (one per string) before the name
+            # First, look for the num_strings indicator
+
+            # Look back to find tuning bytes
+            # Tuning bytes are typically in range 0x14-0x60 (valid MIDI: 96-byte = 36-82)
+            pos = idx - 1
+
+            # Skip nulls and padding
+            while pos > 0 and self.data[pos] == 0:
+                pos -= 1
+
+            # Skip uniform bytes (velocity field - typically 6 bytes all same value)
+            if pos >= 3:
+                uniform_val = self.data[pos]
+                if 0 < uniform_val < 128:
+                    # Measure the run ending at pos (not counting byte 0) with
+                    # rstrip over 16-byte windows
+                    uniform_byte = bytes((uniform_val,))
+                    uniform_count = 0
+                    check_pos = pos
+                    while check_pos > 0:
+                        window = data[max(1, check_pos - 15):check_pos + 1]
+                        run = len(window) - len(window.rstrip(uniform_byte))
+                        uniform_count += run
+                        check_pos -= run
+                        if run < len(window):
+                            break
+                    if uniform_count >= 4:
+                        pos -= uniform_count
+
+            # After velocity, check if there's a null separator before tuning
+            # Pattern 1: [tuning bytes][velocity bytes] - no separator
+            # Pattern 2: [tuning bytes][null][extra bytes][velocity bytes] - has separator
+            #
+            # Look for null within a small window; if found, tuning is before it
+            num_strings = default_strings
+            tuning_pitches = []
+
+            # Check if there's a null within next few bytes (separator pattern)
+            null_pos = -1
+            for check in range(pos, max(pos - 3, 0), -1):
+                if self.data[check] == 0:
+                    null_pos = check
+                    break
 
-                if null_pos >= 0:
-                    # Found null separator - tuning is immediately before it
-                    tuning_end = null_pos
-                else:
-                    # No separator - tuning ends at current position
-                    tuning_end = pos + 1
-
-                tuning_start = tuning_end - num_strings
-
-                if tuning_start >= 0:
-                    tuning_bytes = list(self.data[tuning_start:tuning_end])
-                    # Validate tuning bytes are in reasonable range (MIDI 36-82)
-                    valid = all(0x10 <= b <= 0x60 for b in tuning_bytes)
-                    if valid:
-                        tuning_pitches = [96 - b for b in tuning_bytes]
-
-                found_offsets.add(idx)
-                instruments.append(TEFInstrument(
-                    name=name,
-                    tuning_name=tuning_name,
-                    num_strings=num_strings,
-                    tuning_pitches=tuning_pitches,
-                    offset=idx,
-                ))
-                idx += 1
+            if null_pos >= 0:
+                # Found null separator - tuning is immediately before it
+                tuning_end = null_pos
+            else:
+                # No separator - tuning ends at current position
+                tuning_end = pos + 1
+
+            tuning_start = tuning_end - num_strings
+
+            if tuning_start >= 0:
+                tuning_bytes = list(self.data[tuning_start:tuning_end])
+                # Validate tuning bytes are in reasonable range (MIDI 36-82)
+                valid = all(0x10 <= b <= 0x60 for b in tuning_bytes)
+                if valid:
+                    tuning_pitches = [96 - b for b in tuning_bytes]
+
+            found_offsets.add(idx)
+            instruments.append(TEFInstrument(
+                name=name,
+                tuning_name=tuning_name,
+                num_strings=num_strings,
+                tuning_pitches=tuning_pitches,
+                offset=idx,
+            ))
 
         # Sort by offset to maintain order
         instruments.sort(key=lambda x: x.offset)
 
+        self._instruments = instruments
         return instruments
 
     def parse_chords(self) -> list[TEFChord]:
         """Parse chord symbols from the file."""
-        chords = []
-
-        # Look for common chord patterns
-        # Chords appear as length-prefixed strings in a specific region
-        strings = self.find_strings()
-
-        chord_patterns = {'C', 'D', 'E', 'F', 'G', 'A', 'B'}
-        for s in strings:
-            # Chord names: start with note letter, may have modifiers
-            if s.value and s.value[0] in chord_patterns:
-                # Filter: short, no spaces (not a title)
-                if len(s.value) <= 10 and ' ' not in s.value:
-                    # Additional filter: common chord suffixes
-                    if len(s.value) == 1 or any(
-                        s.value[1:].startswith(suf)
-                        for suf in ['m', '7', 'maj', 'min', 'dim', 'aug', '#', 'b', 'sus']
-                    ):
-                        chords.append(TEFChord(name=s.value, offset=s.offset))
-
-        return chords
+        return self.parse_chords_and_sections()[0]
 
     def parse_sections(self) -> list[TEFSection]:
         """Parse section markers (A Part, B Part, etc.)."""
+        return self.parse_chords_and_sections()[1]
+
+    def parse_chords_and_sections(self) -> tuple[list[TEFChord], list[TEFSection]]:
+        """Classify the file's strings into chords and sections in one pass.
+
+        Chords appear as length-prefixed strings in a specific region. A
+        string can be both (e.g. "Bm(Part)").
+        """
+        chords = []
         sections = []
-        strings = self.find_strings()
 
-        for s in strings:
-            if 'Part' in s.value or s.value.startswith('(') and s.value.endswith(')'):
-                sections.append(TEFSection(name=s.value, offset=s.offset))
+        for s in self.find_strings():
+            value = s.value
+            # Look for common chord patterns
+            if CHORD_NAME_RE.fullmatch(value):
+                chords.append(TEFChord(name=value, offset=s.offset))
+            if 'Part' in value or value.startswith('(') and value.endswith(')'):
+                sections.append(TEFSection(name=value, offset=s.offset))
 
-        return sections
+        return chords, sections
 
     def find_reading_list_offset(self) -> int:
         """Find the reading list offset from header.
@@ -630,7 +720,7 @@ class TEFReader:
             return -1
 
         # Read 4-byte little-endian offset from header position 128
-        pos_of_reading_list = struct.unpack('<I', self.data[128:132])[0]
+        pos_of_reading_list = U32.unpack_from(self.data, 128)[0]
 
         if pos_of_reading_list == 0:
             return -1  # No reading list
@@ -664,8 +754,7 @@ class TEFReader:
         if reading_list_offset + 4 > len(self.data):
             return entries
 
-        entry_size = struct.unpack('<H', self.data[reading_list_offset:reading_list_offset + 2])[0]
-        entry_count = struct.unpack('<H', self.data[reading_list_offset + 2:reading_list_offset + 4])[0]
+        entry_size, entry_count = U16_PAIR.unpack_from(self.data, reading_list_offset)
 
         # Sanity checks
         if entry_size < 4 or entry_size > 256 or entry_count > 100:
@@ -679,8 +768,7 @@ class TEFReader:
                 break
 
             # Read 2-byte measures (little-endian shorts)
-            from_measure = struct.unpack('<H', self.data[entry_offset:entry_offset + 2])[0]
-            to_measure = struct.unpack('<H', self.data[entry_offset + 2:entry_offset + 4])[0]
+            from_measure, to_measure = U16_PAIR.unpack_from(self.data, entry_offset)
 
             # Skip invalid entries
             if from_measure == 0 and to_measure == 0:
@@ -706,12 +794,17 @@ class TEFReader:
 
         Returns the component region start offset, or -1 if not found.
         """
+        if self._component_offset is None:
+            self._component_offset = self._read_component_offset()
+        return self._component_offset
+
+    def _read_component_offset(self) -> int:
         debt_pos = self.data.find(b'debt')
         if debt_pos < 0:
             return -1
 
         # Read the 4-byte pointer value after 'debt' - this points directly to components
-        debt_val = struct.unpack('<I', self.data[debt_pos + 4:debt_pos + 8])[0]
+        debt_val = U32.unpack_from(self.data, debt_pos + 4)[0]
 
         if debt_val >= len(self.data) or debt_val < 100:
             return -1
@@ -738,17 +831,14 @@ class TEFReader:
         if offset >= 0:
             return (offset, 'unified')
 
-        # Fallback: search for marker pattern at byte 11
-        for start in range(0x400, len(self.data) - 24, 4):
-            rec1 = self.data[start:start+12]
-            rec2 = self.data[start+12:start+24]
-
-            if len(rec1) < 12 or len(rec2) < 12:
-                continue
-
-            # Check for valid markers at byte 11
-            if (rec1[11] in (0x49, 0x46, 0x4c) and
-                rec2[11] in (0x49, 0x46, 0x4c)):
+        # Fallback: search for marker pattern at byte 11 of two consecutive
+        # records, on 4-byte aligned starts from 0x400
+        limit = len(self.data) - 24
+        for match in MARKER_PAIR_RE.finditer(self.data, 0x400 + 11):
+            start = match.start() - 11
+            if start >= limit:
+                break
+            if start % 4 == 0:
                 return (start, 'unified')
 
         return (-1, '')
@@ -772,86 +862,54 @@ class TEFReader:
             if start_offset < 0:
                 return events
 
+        # Get track string counts for track identification
+        track_string_counts = [inst.num_strings for inst in self.parse_instruments()]
+
         # Calculate total strings across all instruments for location decoding
-        total_strings = sum(inst.num_strings for inst in self.parse_instruments())
+        total_strings = sum(track_string_counts)
         if total_strings == 0:
             total_strings = 5  # Default to single 5-string instrument
 
         VALUE_PER_STRING = 8
         VALUE_PER_POSITION = 32 * total_strings
 
-        # Get track string counts for track identification
-        instruments = self.parse_instruments()
-        track_string_counts = [inst.num_strings for inst in instruments]
         if not track_string_counts:
             track_string_counts = [5]  # Default banjo
+        # Which track owns each cumulative string a location can encode
+        string_tracks = track_string_table(track_string_counts, VALUE_PER_POSITION // VALUE_PER_STRING)
 
-        # Non-note component types (from TuxGuitar TEInputStream.java)
-        NON_NOTE_TYPES = {0x33, 0x35, 0x36, 0x37, 0x38, 0x39, 0x3D,
-                         0x75, 0x78, 0x7D, 0x7E, 0xB6, 0xB7, 0xBD, 0xBE, 0xFD, 0xFE}
-
-        offset = start_offset
         consecutive_invalid = 0
         max_invalid = 20
 
-        while offset + 12 <= len(self.data):
-            record = self.data[offset:offset + 12]
-
-            # TuxGuitar format: bytes 0-3 = location, byte 4 = component type
-            location = struct.unpack('<I', record[0:4])[0]
-            component_type = record[4]
-
-            # Skip known non-note component types
-            if component_type in NON_NOTE_TYPES:
-                offset += 12
-                continue
-
-            # Check if it's a note: bits 0-4 should be in range 1-25 (fret 0-24)
-            lower_bits = component_type & 0x1f
-            if lower_bits < 0x01 or lower_bits > 0x19:
-                # Not a valid note - might be end of components or unknown type
-                offset += 12
-                consecutive_invalid += 1
-                if consecutive_invalid >= max_invalid:
-                    break
+        # Unpack the fixed fields of every whole record in one pass
+        num_records = max(0, (len(self.data) - start_offset) // 12)
+        end_offset = start_offset + num_records * 12
+        records = COMPONENT_RECORD.iter_unpack(memoryview(self.data)[start_offset:end_offset])
+
+        for offset, (location, component_type, marker_byte) in zip(range(start_offset, end_offset, 12), records):
+            # Fret from the component type, or skip known non-note types
+            fret = COMPONENT_FRETS[component_type]
+            if fret < 0:
+                if fret == INVALID_COMPONENT:
+                    # Not a valid note - might be end of components or unknown type
+                    consecutive_invalid += 1
+                    if consecutive_invalid >= max_invalid:
+                        break
                 continue
 
             consecutive_invalid = 0
 
-            # Decode note properties
-            fret = lower_bits - 1
-
             # Calculate cumulative string from location
             cumulative_string = (location % VALUE_PER_POSITION) // VALUE_PER_STRING
 
             # Find which track owns this string
-            track_idx = 0
-            local_string = cumulative_string
-            for idx, num_strings in enumerate(track_string_counts):
-                if local_string < num_strings:
-                    track_idx = idx
-                    break
-                local_string -= num_strings
+            track_idx, local_string = string_tracks[cumulative_string]
 
             # Calculate position (in 16th note grid)
             position = location // VALUE_PER_POSITION
 
-            # Read actual marker from record[5] (I=Initial, F=Fret, L=Legato, etc.)
-            marker_byte = record[5]
-            if marker_byte == 0x49:  # 'I'
-                marker = 'I'
-            elif marker_byte == 0x46:  # 'F'
-                marker = 'F'
-            elif marker_byte == 0x4c:  # 'L'
-                marker = 'L'
-            elif marker_byte == 0x43:  # 'C'
-                marker = 'C'
-            elif marker_byte == 0x40:  # '@'
-                marker = '@'
-            elif marker_byte == 0x41:  # 'A'
-                marker = 'A'
-            else:
-                marker = chr(marker_byte) if 32 <= marker_byte <= 126 else 'F'
+            # Marker from record[5] (I=Initial, F=Fret, L=Legato, etc.)
+            marker = MARKER_CHARS[marker_byte]
 
             # Check for grace note flag in component type
             is_grace_note = bool(component_type & 0x40)
@@ -864,11 +922,9 @@ class TEFReader:
                 marker=marker,
                 extra=local_string + 1,  # Store 1-indexed local string
                 pitch_byte=fret,          # Store fret directly
-                raw_data=record,
+                raw_data=self.data[offset:offset + 12],
             ))
 
-            offset += 12
-
         return events
 
     def parse_note_events_v2(self, header: TEFHeader) -> list[TEFNoteEvent]:
@@ -903,34 +959,37 @@ class TEFReader:
         track_string_counts = [inst.num_strings for inst in instruments]
         if not track_string_counts:
             track_string_counts = [num_strings]  # Single track fallback
+        string_tracks = track_string_table(track_string_counts, num_strings)
 
         # TuxGuitar uses mData to handle measure overflow (when location wraps)
         m_data = 0
         m_index = 0
+        measure_size = ts_size * num_strings  # Locations per measure
+        POSITIONS_PER_MEASURE = 16  # 16th notes in 4/4
 
-        offset = component_offset
-        for _ in range(component_count):
-            if offset + 6 > len(self.data):
-                break
-
-            rec = self.data[offset:offset + 6]
+        # Unpack the used fields of every whole record in one pass; only
+        # note records are copied for raw_data
+        data = self.data
+        num_records = min(component_count, max(0, (len(data) - component_offset) // 6))
+        end_offset = component_offset + num_records * 6
+        records = V2_RECORD.iter_unpack(memoryview(data)[component_offset:end_offset])
 
+        for offset, (loc_low, loc_high, fret_byte, effect2) in zip(range(component_offset, end_offset, 6), records):
             # Decode location with overflow handling (per TuxGuitar)
-            location = (rec[0] & 0xff) + (256 * (m_data + (rec[1] & 0xff)))
+            location = loc_low + (256 * (m_data + loc_high))
+            measure, within_measure = divmod(location, measure_size)
 
             # Check for measure overflow
-            if (location // (ts_size * num_strings)) < m_index:
+            if measure < m_index:
                 m_data += 256
-                location = (rec[0] & 0xff) + (256 * (m_data + (rec[1] & 0xff)))
+                location = loc_low + (256 * (m_data + loc_high))
+                measure, within_measure = divmod(location, measure_size)
 
-            # Decode position/string/measure
-            position_in_measure = location % ts_size
-            cumulative_string = (location // ts_size) % num_strings
-            measure = location // (ts_size * num_strings)
+            # Decode position/string within the measure
+            cumulative_string, position_in_measure = divmod(within_measure, ts_size)
 
             m_index = measure  # Track current measure for overflow detection
 
-            fret_byte = rec[2]
             fret_raw = fret_byte & 0x1f
 
             # Check for note vs special component
@@ -940,20 +999,13 @@ class TEFReader:
 
                 # Handle high frets (bit 5 set means add effect2 to fret)
                 if (fret_byte >> 5) & 0x01:
-                    fret += rec[5] & 0xff
+                    fret += effect2
 
                 # Map cumulative string to track and local string
-                track_idx = 0
-                local_string = cumulative_string
-                for idx, num_track_strings in enumerate(track_string_counts):
-                    if local_string < num_track_strings:
-                        track_idx = idx
-                        break
-                    local_string -= num_track_strings
+                track_idx, local_string = string_tracks[cumulative_string]
 
                 # Convert to 16th-note position for consistency with v3 format
                 # (MIDI exporter expects positions in 16th note units)
-                POSITIONS_PER_MEASURE = 16  # 16th notes in 4/4
                 abs_position = measure * POSITIONS_PER_MEASURE + (position_in_measure * POSITIONS_PER_MEASURE // ts_size)
 
                 # Create note event
@@ -963,11 +1015,9 @@ class TEFReader:
                     marker='F',
                     extra=local_string + 1,  # 1-indexed local string within track
                     pitch_byte=fret,
-                    raw_data=rec,
+                    raw_data=data[offset:offset + 6],
                 ))
 
-            offset += 6
-
         return events
 
     def parse_instruments_v2(self, header: TEFHeader) -> list[TEFInstrument]:
@@ -994,6 +1044,16 @@ class TEFReader:
         else:
             return self._parse_v3(header)
 
+    def parse_notes_only(self) -> list[TEFNoteEvent]:
+        """Parse just the note events, same as parse().note_events.
+
+        Skips the string, chord, section and reading list scans.
+        """
+        header = self.read_header()
+        if header.is_v2:
+            return self.parse_note_events_v2(header)
+        return self.parse_note_events()
+
     def _parse_v2(self, header: TEFHeader) -> TEFFile:
         """Parse V2 format TEF file."""
         # Title comes from header for v2
@@ -1036,8 +1096,7 @@ class TEFReader:
                     title = s.value
 
         instruments = self.parse_instruments()
-        chords = self.parse_chords()
-        sections = self.parse_sections()
+        chords, sections = self.parse_chords_and_sections()
         note_events = self.parse_note_events()
         reading_list = self.parse_reading_list()
 
@@ -0,0 +1,92 @@
+"""Tests for MIDI exporter."""
+
+from pathlib import Path
+
+import mido
+import pytest
+
+from tef_parser import TEFReader
+from tef_parser.midi import POSITIONS_PER_MEASURE, encode_varlen, expand_notes_with_reading_list, tef_to_midi
+from tef_parser.reader import TEFReadingListEntry
+
+
+SAMPLE_FILE = Path(__file__).parent.parent / "samples" / "songs" / "shuck_the_corn.tef"
+
+
+def test_reading_list_expansion():
+    """Test that reading list expansion matches a brute-force scan."""
+    reader = TEFReader(SAMPLE_FILE)
+    tef = reader.parse()
+    notes = sorted((e for e in tef.note_events if e.is_melody), key=lambda e: e.position)
+
+    expanded = expand_notes_with_reading_list(notes, tef.reading_list, POSITIONS_PER_MEASURE)
+
+    expected = []
+    offset = 0
+    for entry in tef.reading_list:
+        start = (entry.from_measure - 1) * POSITIONS_PER_MEASURE
+        end = entry.to_measure * POSITIONS_PER_MEASURE
+        for e in notes:
+            if start <= e.position < end:
+                expected.append((offset * POSITIONS_PER_MEASURE + e.position - start, e))
+        offset += entry.to_measure - entry.from_measure + 1
+    expected.sort(key=lambda x: x[0])
+
+    assert [(t, id(e)) for t, e in expanded] == [(t, id(e)) for t, e in expected]
+
+
+def test_tef_to_midi(tmp_path):
+    """Test that exported MIDI has balanced, time-ordered note events."""
+    reader = TEFReader(SAMPLE_FILE)
+    tef = reader.parse()
+    output = tmp_path / "out.mid"
+
+    assert tef_to_midi(tef, output, track_filter=0)
+
+    mid = mido.MidiFile(output)
+    notes = [m for m in mid.tracks[1] if m.type in ('note_on', 'note_off')]
+    assert notes
+    assert all(m.time >= 0 for m in notes)
+    assert sum(m.type == 'note_on' for m in notes) == sum(m.type == 'note_off' for m in notes)
+
+
+def test_encode_varlen_rejects_negative():
+    """Test that a negative delta raises instead of looping forever."""
+    assert encode_varlen(0) == b'\x00'
+    assert encode_varlen(0x80) == b'\x81\x00'
+    with pytest.raises(ValueError):
+        encode_varlen(-1)
+
+
+def test_tef_to_midi_reversed_reading_list(tmp_path):
+    """Test that a reversed reading-list entry still exports in time order."""
+    tef = TEFReader(SAMPLE_FILE).parse()
+    tef.reading_list = [
+        TEFReadingListEntry(index=1, from_measure=1, to_measure=2, offset=0),
+        TEFReadingListEntry(index=2, from_measure=8, to_measure=1, offset=0),
+        TEFReadingListEntry(index=3, from_measure=1, to_measure=2, offset=0),
+    ]
+    output = tmp_path / "out.mid"
+
+    assert tef_to_midi(tef, output, track_filter=0)
+
+    mid = mido.MidiFile(output)
+    notes = [m for m in mid.tracks[1] if m.type in ('note_on', 'note_off')]
+    assert notes
+    assert all(m.time >= 0 for m in notes)
+
+
+def test_reading_list_skips_reversed_entries():
+    """Test that reversed reading-list entries play nothing and keep the offset."""
+    tef = TEFReader(SAMPLE_FILE).parse()
+    notes = sorted((e for e in tef.note_events if e.is_melody), key=lambda e: e.position)
+    forward = [
+        TEFReadingListEntry(index=1, from_measure=1, to_measure=2, offset=0),
+        TEFReadingListEntry(index=3, from_measure=1, to_measure=2, offset=0),
+    ]
+    reversed_entry = TEFReadingListEntry(index=2, from_measure=8, to_measure=1, offset=0)
+
+    expanded = expand_notes_with_reading_list(notes, [forward[0], reversed_entry, forward[1]], POSITIONS_PER_MEASURE)
+
+    assert expanded == expand_notes_with_reading_list(notes, forward, POSITIONS_PER_MEASURE)
+    assert [t for t, _ in expanded] == sorted(t for t, _ in expanded)
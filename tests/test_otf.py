@@ -0,0 +1,70 @@
+"""Tests for OTF exporter."""
+
+import io
+import json
+from argparse import Namespace
+from pathlib import Path
+
+import pytest
+
+from tef_parser import TEFReader
+from tef_parser import otf as otf_module
+from tef_parser.cli import cmd_otf
+from tef_parser.otf import tef_to_otf
+
+
+SAMPLE_FILE = Path(__file__).parent.parent / "samples" / "songs" / "shuck_the_corn.tef"
+
+
+def test_write_json():
+    """Test that streamed JSON matches json.dumps of to_dict()."""
+    reader = TEFReader(SAMPLE_FILE)
+    doc = tef_to_otf(reader.parse())
+    assert doc.notation
+
+    for indent in (None, 2, 4):
+        buf = io.StringIO()
+        doc.write_json(buf, indent=indent)
+        assert json.loads(buf.getvalue()) == doc.to_dict()
+        assert buf.getvalue() == json.dumps(doc.to_dict(), indent=indent)
+
+
+def test_write_json_orjson():
+    """Test that orjson output matches json.dumps, including non-ASCII text."""
+    pytest.importorskip("orjson")
+    reader = TEFReader(SAMPLE_FILE)
+    doc = tef_to_otf(reader.parse())
+
+    for title in ("Shuck the Corn", "Caf\u00e9 \U0001f3b8"):
+        doc.metadata.title = title
+        buf = io.StringIO()
+        doc.write_json(buf)
+        assert buf.getvalue() == json.dumps(doc.to_dict(), indent=2)
+
+
+def test_cmd_otf_failed_write(tmp_path, monkeypatch):
+    """Test that a failed export leaves neither output nor temp file."""
+    def fail(self, fp):
+        fp.write("partial")
+        raise RuntimeError("boom")
+
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.delenv("TEF_PARSER_NO_CACHE", raising=False)
+    monkeypatch.setattr(otf_module.OTFDocument, "write_yaml", fail)
+    output = tmp_path / "out.otf.yaml"
+    args = Namespace(input=str(SAMPLE_FILE), output=str(output), json=False, stdout=False, no_cache=False)
+
+    with pytest.raises(RuntimeError):
+        cmd_otf(args)
+    assert list(tmp_path.glob("out.otf.yaml*")) == []
+
+
+def test_write_yaml():
+    """Test YAML output: byte-stable by default, same data with fast=True."""
+    yaml = pytest.importorskip("yaml")
+    reader = TEFReader(SAMPLE_FILE)
+    doc = tef_to_otf(reader.parse())
+
+    expected = yaml.dump(doc.to_dict(), default_flow_style=False, sort_keys=False, allow_unicode=True)
+    assert doc.to_yaml() == expected
+    assert yaml.safe_load(doc.to_yaml(fast=True)) == doc.to_dict()
@@ -2,7 +2,9 @@
 
 from pathlib import Path
 
-from tef_parser import TEFReader
+from tef_parser import TEFReader, parse_cached
+from tef_parser import cache as cache_module
+from tef_parser import reader as reader_module
 
 
 SAMPLE_FILE = Path(__file__).parent.parent / "samples" / "songs" / "shuck_the_corn.tef"
@@ -154,3 +156,65 @@ def test_v2_file_parsing():
     # V2 notes have 6-byte raw data
     for evt in tef.note_events:
         assert len(evt.raw_data) == 6
+
+
+def test_parse_cached(tmp_path, monkeypatch):
+    """Test that cached parses match a fresh parse."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    monkeypatch.delenv("TEF_PARSER_NO_CACHE", raising=False)
+
+    fresh = TEFReader(SAMPLE_FILE).parse()
+    first = parse_cached(SAMPLE_FILE)
+    assert list((tmp_path / "tef_parser").glob("*.pickle"))
+    second = parse_cached(SAMPLE_FILE)
+
+    assert first == fresh
+    assert second == fresh
+    assert second.path == SAMPLE_FILE
+    assert (tmp_path / "tef_parser").stat().st_mode & 0o777 == 0o700
+
+
+def test_parse_cached_prune(tmp_path, monkeypatch):
+    """Test that stale-parser entries are pruned and the entry count capped."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    monkeypatch.delenv("TEF_PARSER_NO_CACHE", raising=False)
+    monkeypatch.setattr(cache_module, "MAX_ENTRIES", 1)
+    directory = tmp_path / "tef_parser"
+    directory.mkdir(mode=0o700)
+    (directory / "000000000000-stale.pickle").write_bytes(b"")
+
+    parse_cached(SAMPLE_FILE)
+    parse_cached(V2_SAMPLE_FILE)
+
+    entries = list(directory.glob("*.pickle"))
+    assert entries == [cache_module._cache_path(V2_SAMPLE_FILE, cache_module._parser_stamp())]
+
+
+def test_parse_cached_disabled(tmp_path, monkeypatch):
+    """Test that the cache can be bypassed by argument or environment."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    monkeypatch.delenv("TEF_PARSER_NO_CACHE", raising=False)
+    fresh = TEFReader(SAMPLE_FILE).parse()
+
+    assert parse_cached(SAMPLE_FILE, use_cache=False) == fresh
+    monkeypatch.setenv("TEF_PARSER_NO_CACHE", "1")
+    assert parse_cached(SAMPLE_FILE) == fresh
+    assert not (tmp_path / "tef_parser").exists()
+
+
+def test_parse_mmap(monkeypatch):
+    """Test that memory-mapped files parse the same as in-memory ones."""
+    expected = [TEFReader(path).parse() for path in (SAMPLE_FILE, V2_SAMPLE_FILE)]
+    monkeypatch.setattr(reader_module, "MMAP_THRESHOLD", 0)
+
+    for path, fresh in zip((SAMPLE_FILE, V2_SAMPLE_FILE), expected):
+        with TEFReader(path) as reader:
+            assert not isinstance(reader.data, bytes)
+            assert reader.parse() == fresh
+        assert reader.data.closed
+
+
+def test_parse_notes_only():
+    """Test that parse_notes_only matches the full parse's note events."""
+    for path in (SAMPLE_FILE, V2_SAMPLE_FILE):
+        assert TEFReader(path).parse_notes_only() == TEFReader(path).parse().note_events